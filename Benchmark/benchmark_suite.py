@@ -0,0 +1,211 @@
+"""Benchmark suite of the world hot paths, on several world sizes and outbreak
+phases, saved as JSON so results can be compared between commits."""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import warnings
+from typing import Any, Callable
+import numpy as np
+
+
+from Entity.entity_type import EntityType
+from World.array_world import ArrayWorld
+from World.world import World
+
+
+# Every benchmarked world, by name: the object world, the array world stepping each entity, and the batched array world.
+WORLD_FACTORIES: dict[str, Callable[..., World]] = {
+    'world': World,
+    'array': ArrayWorld,
+    'batched': lambda **kwargs: ArrayWorld(batched=True, **kwargs),
+}
+
+# Every world stepping one entity at a time, only benchmarked on small worlds by default (a peak of a big one takes hours).
+PER_ENTITY_WORLDS: tuple[str, ...] = ('world', 'array')
+
+# Every outbreak phase the operations are timed at, in the order they're reached.
+PHASES: tuple[str, ...] = ('early', 'peak', 'burn-out')
+
+# A world is burning out once its infected entities are at most this fraction of its peak.
+BURN_OUT_FRACTION: float = 0.1
+
+# Every timed read-only operation, by name.
+OPERATIONS: dict[str, Callable[[World], Any]] = {
+    'get_matching_entity_type_positions': lambda world: world.get_matching_entity_type_positions(target_entity_type=EntityType.INFECTED),
+    'count_entity_type': lambda world: world.count_entity_type(target_entity_type=EntityType.INFECTED),
+    'count_symptom_status': lambda world: world.count_symptom_status(target_symptom_status='SINTOMÁTICO'),
+    'count_mortality_status': lambda world: world.count_mortality_status(target_mortality_status='GRAVE'),
+    'count_survival_status': lambda world: world.count_survival_status(target_survival_status='MORTE'),
+    'save_state': lambda world: world.save_state(),
+    'show_current_iteration_world_state': lambda world: world.show_current_iteration_world_state(),
+}
+
+
+def measure(operation: Callable[[], Any], repeats: int) -> dict:
+    """Time an operation some times, then trace the peak memory it allocates in one more call."""
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        operation()
+        durations.append(time.perf_counter() - start)
+    # Tracing slows everything down, so it's kept apart from the timed calls.
+    tracemalloc.start()
+    operation()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'repeats': repeats, 'min_seconds': min(durations), 'median_seconds': statistics.median(durations), 'peak_memory_bytes': peak_memory}
+
+
+def count_infected(world: World) -> int:
+    """Get the amount of infected entities in a world."""
+    return len(world.get_infected_positions())
+
+
+def advance_to_phase(world: World, phase: str, max_steps: int) -> None:
+    """Step a world until it reaches an outbreak phase (or the step limit), array worlds step batched meanwhile."""
+    is_batched = getattr(world, 'batched', None)
+    if is_batched is not None:
+        world.batched = True
+    peak_infected = previous_infected = count_infected(world=world)
+    while world.has_infected_entities() and world.iteration_step < max_steps:
+        world.next_iteration()
+        infected = count_infected(world=world)
+        peak_infected = max(peak_infected, infected)
+        if phase == 'early' or (phase == 'peak' and infected < previous_infected) or (phase == 'burn-out' and infected <= BURN_OUT_FRACTION * peak_infected):
+            break
+        previous_infected = infected
+    if is_batched is not None:
+        world.batched = is_batched
+
+
+def benchmark_world(world_name: str, shape: int, infected_fraction: float, seed: int, repeats: int, steps: int, max_steps: int, directory: str) -> list[dict]:
+    """Time the initialization of a world and every operation at every outbreak phase."""
+    world_arguments = {
+        'shape': shape,
+        'initial_infected': max(1, int(shape * shape * infected_fraction)),
+        'seed': seed,
+        'data_file_path': os.path.join(directory, f'{world_name}_{shape}.csv'),
+    }
+    results = []
+    initialization = measure(operation=lambda: WORLD_FACTORIES[world_name](**world_arguments).close(), repeats=repeats)
+    results.append({'world': world_name, 'shape': shape, 'phase': 'initial', 'iteration': 0, 'infected': world_arguments['initial_infected'], 'operation': '__init__', **initialization})
+
+    world = WORLD_FACTORIES[world_name](**world_arguments)
+    for phase in PHASES:
+        advance_to_phase(world=world, phase=phase, max_steps=max_steps)
+        timings = {name: measure(operation=lambda operation=operation: operation(world), repeats=repeats) for name, operation in OPERATIONS.items()}
+        # Stepping changes the world, so it's timed last, from the same state.
+        timings['next_iteration'] = measure(operation=world.next_iteration, repeats=steps)
+        for name, timing in timings.items():
+            results.append({'world': world_name, 'shape': shape, 'phase': phase, 'iteration': world.iteration_step, 'infected': count_infected(world=world), 'operation': name, **timing})
+    if world.renderer is not None:
+        world.renderer.plt.close(world.renderer.figure)
+    world.close()
+    del world
+    return results
+
+
+def get_commit() -> str | None:
+    """Get the current git commit, if any."""
+    try:
+        return subprocess.run(args=['git', 'rev-parse', 'HEAD'], capture_output=True, check=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(world_names: tuple[str, ...], shapes: tuple[int, ...], infected_fraction: float, seed: int, repeats: int, steps: int, max_steps: int, max_per_entity_shape: int | None = 500) -> dict:
+    """Run the whole suite, headless, and get its results with the environment they were measured in.
+
+    Parameters
+    ----------
+    world_names : tuple[str, ...]
+        Every benchmarked world (see `WORLD_FACTORIES`).
+    shapes : tuple[int, ...]
+        Every benchmarked amount of rows and columns.
+    infected_fraction : float
+        The fraction of initially infected entities.
+    seed : int
+        The seed of every world.
+    repeats : int
+        How many times every operation is timed.
+    steps : int
+        How many iterations are timed at every phase.
+    max_steps : int
+        The maximum amount of iterations stepped to reach a phase.
+    max_per_entity_shape : int | None
+        The biggest shape the per-entity worlds (see `PER_ENTITY_WORLDS`) are
+        benchmarked on, bigger ones are skipped, None benchmarks every shape.
+    """
+    # pylint: disable=C0415
+    import matplotlib
+    matplotlib.use('Agg')
+    results = []
+    with tempfile.TemporaryDirectory() as directory, warnings.catch_warnings():
+        # Drawing on a non-interactive backend warns on every pause.
+        warnings.simplefilter('ignore', category=UserWarning)
+        for world_name in world_names:
+            for shape in shapes:
+                if world_name in PER_ENTITY_WORLDS and max_per_entity_shape is not None and shape > max_per_entity_shape:
+                    continue
+                results.extend(benchmark_world(world_name=world_name, shape=shape, infected_fraction=infected_fraction, seed=seed, repeats=repeats, steps=steps, max_steps=max_steps, directory=directory))
+    return {
+        'environment': {'commit': get_commit(), 'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.platform(), 'processor': platform.processor()},
+        'parameters': {'infected_fraction': infected_fraction, 'seed': seed, 'repeats': repeats, 'steps': steps, 'max_steps': max_steps, 'max_per_entity_shape': max_per_entity_shape},
+        'results': results,
+    }
+
+
+def compare_results(baseline: dict, current: dict) -> list[tuple[str, float, float, float]]:
+    """Get the median duration of every operation measured in both results, and how many times slower it got."""
+    get_key = lambda result: f'{result["world"]}/{result["shape"]}/{result["phase"]}/{result["operation"]}'
+    baseline_durations = {get_key(result): result['median_seconds'] for result in baseline['results']}
+    comparison = []
+    for result in current['results']:
+        key = get_key(result)
+        if key in baseline_durations:
+            comparison.append((key, baseline_durations[key], result['median_seconds'], result['median_seconds'] / max(baseline_durations[key], 1e-12)))
+    return comparison
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks the world hot paths on several sizes and outbreak phases.')
+    parser.add_argument('--worlds', nargs='+', choices=list(WORLD_FACTORIES), default=['array', 'batched'], help='Every benchmarked world.')
+    parser.add_argument('--shapes', type=int, nargs='+', default=[100, 500, 1000, 5000], help='Every amount of rows and columns to benchmark.')
+    parser.add_argument('--infected-fraction', type=float, default=0.001, help='The fraction of initially infected entities.')
+    parser.add_argument('--seed', type=int, default=0, help='The seed of every world.')
+    parser.add_argument('--repeats', type=int, default=5, help='How many times every operation is timed.')
+    parser.add_argument('--steps', type=int, default=3, help='How many iterations are timed at every phase.')
+    parser.add_argument('--max-steps', type=int, default=2000, help='The maximum amount of iterations stepped to reach a phase.')
+    parser.add_argument('--max-per-entity-shape', type=int, default=500, help='The biggest shape the per-entity worlds are benchmarked on, 0 for every shape.')
+    parser.add_argument('--output', default='benchmark_results.json', help='Where the results are saved.')
+    parser.add_argument('--compare', default=None, help='Previous results to compare against.')
+    arguments = parser.parse_args()
+    suite_results = run_suite(
+        world_names=tuple(arguments.worlds),
+        shapes=tuple(arguments.shapes),
+        infected_fraction=arguments.infected_fraction,
+        seed=arguments.seed,
+        repeats=arguments.repeats,
+        steps=arguments.steps,
+        max_steps=arguments.max_steps,
+        max_per_entity_shape=arguments.max_per_entity_shape or None,
+    )
+    with open(file=arguments.output, mode='w', encoding='utf-8') as file:
+        json.dump(obj=suite_results, fp=file, indent=2)
+        file.close()
+    if arguments.compare is not None:
+        with open(file=arguments.compare, mode='r', encoding='utf-8') as file:
+            baseline_results = json.load(fp=file)
+            file.close()
+        print(f'{"operation":<72} {"before (s)":>11} {"after (s)":>11} {"ratio":>7}')
+        for operation_key, before, after, ratio in compare_results(baseline=baseline_results, current=suite_results):
+            print(f'{operation_key:<72} {before:>11.6f} {after:>11.6f} {ratio:>7.2f}')
+    else:
+        for suite_result in suite_results['results']:
+            print(f'{suite_result["world"]:>8} {suite_result["shape"]:>6} {suite_result["phase"]:>9} {suite_result["operation"]:<36} {suite_result["median_seconds"]:>10.6f}s {suite_result["peak_memory_bytes"]:>12}B')
@@ -0,0 +1,48 @@
+"""Benchmark of the strip world speedup over the single-process batched world,
+on 1, 2, 4 and 8 worker processes."""
+import argparse
+import time
+
+
+from World.array_world import ArrayWorld
+from World.strip_world import StripWorld
+
+
+def time_iterations(world: ArrayWorld, steps: int) -> float:
+    """Time (in seconds) the mean duration of an iteration, after a warm-up one."""
+    world.next_iteration()
+    start = time.perf_counter()
+    for _ in range(steps):
+        world.next_iteration()
+    return (time.perf_counter() - start) / steps
+
+
+def run_benchmark(shape: int, infected_fraction: float, steps: int, process_amounts: tuple[int, ...], seed: int) -> list[tuple[str, float]]:
+    """Time the batched world and the strip world on every amount of processes."""
+    initial_infected = int(shape * shape * infected_fraction)
+    timings = []
+    world = ArrayWorld(shape=shape, initial_infected=initial_infected, seed=seed, data_file_path=None, batched=True)
+    timings.append(('batched', time_iterations(world=world, steps=steps)))
+    del world
+    for processes in process_amounts:
+        world = StripWorld(shape=shape, initial_infected=initial_infected, seed=seed, data_file_path=None, processes=processes)
+        timings.append((f'{processes} processes', time_iterations(world=world, steps=steps)))
+        world.close()
+        del world
+    return timings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks the strip world on 1, 2, 4 and 8 processes.')
+    parser.add_argument('--shape', type=int, default=5000, help='The amount of rows and columns of the world.')
+    parser.add_argument('--infected-fraction', type=float, default=0.01, help='The fraction of initially infected entities.')
+    parser.add_argument('--steps', type=int, default=5, help='The amount of timed iterations.')
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4, 8], help='Every amount of processes to benchmark.')
+    parser.add_argument('--seed', type=int, default=0, help='The seed of every world.')
+    arguments = parser.parse_args()
+    results = run_benchmark(shape=arguments.shape, infected_fraction=arguments.infected_fraction, steps=arguments.steps, process_amounts=tuple(arguments.processes), seed=arguments.seed)
+    # Speedups are over the single-process batched world, the one strips replace.
+    baseline = dict(results)['batched']
+    print(f'{"mode":>14} {"s/iteration":>12} {"speedup":>8}')
+    for mode, duration in results:
+        print(f'{mode:>14} {duration:>12.4f} {baseline / duration:>8.2f}')
@@ -0,0 +1,251 @@
+"""Module responsible for running many seeded worlds of the same scenario
+in parallel and aggregating their statistics into mean and quantile curves."""
+import argparse
+import os
+from multiprocessing import Pool
+import numpy as np
+
+
+from World.array_world import ArrayWorld
+
+
+def run_simulation(task: dict) -> str:
+    """Runs a single seeded world until no infected entity remains (or the step limit) and returns its data file path."""
+    world = ArrayWorld(
+        shape=task['shape'],
+        immune_fraction=task['immune_fraction'],
+        initial_infected=task['initial_infected'],
+        seed=task['seed'],
+        data_file_path=task['data_file_path'],
+        batched=True,
+    )
+    while world.has_infected_entities() and (task['max_steps'] is None or world.iteration_step < task['max_steps']):
+        world.next_iteration()
+    # Also saves the final state, so every run ends on its settled population.
+    world.save_state()
+    world.close()
+    return task['data_file_path']
+
+
+def read_data_file(data_file_path: str) -> tuple[list[str], np.ndarray]:
+    """Read the header and every row of a world data file."""
+    with open(file=data_file_path, mode='r', encoding='utf-8') as file:
+        columns = file.readline().strip().split(',')
+        rows = np.loadtxt(file, delimiter=',', dtype=np.int64, ndmin=2)
+    return columns, rows
+
+
+class EnsembleAggregator:
+    """Represents the per-iteration mean and quantiles of every column, over many runs.
+
+    Runs are folded in one at a time, as they finish, and then dropped: every
+    iteration only keeps the sum of every column (for the mean) and a
+    histogram of its values (for the quantiles), so the memory follows the
+    amount of iterations, never the amount of runs. A run shorter than the
+    longest one keeps its last (settled) state until the end.
+
+    The histogram bins are exact for small values and grow geometrically up
+    to the largest possible value, every bin also keeps the smallest and the
+    largest value it got. A quantile is spread evenly between those two, so
+    it's off by about one percent (of its value) at most and never outside
+    the values actually seen.
+    """
+
+    def __init__(self, max_value: int, quantiles: tuple[float, ...] = (0.05, 0.5, 0.95), bin_amount: int = 1024) -> None:
+        """Initializes an empty ensemble.
+
+        Parameters
+        ----------
+        max_value : int
+            The largest value any column can take, such as the world area.
+        quantiles : tuple[float, ...]
+            Every quantile curve to compute, alongside the mean.
+        bin_amount : int
+            The (maximum) amount of histogram bins of every column and iteration.
+        """
+        self.quantiles: tuple[float, ...] = quantiles
+        # The first value of every bin, then the end of the last one.
+        self.bin_edges: np.ndarray = np.unique(np.concatenate(([0], np.round(np.geomspace(start=1, stop=max_value + 1, num=bin_amount))))).astype(np.int64)
+        self.columns: list[str] = []
+        self.run_amount: int = 0
+        # The sum, histogram and smallest and largest value of every bin of every column at every iteration,
+        # then the same for the last row of every run.
+        self.sums: np.ndarray = np.zeros(shape=(0, 0), dtype=np.float64)
+        self.histograms: np.ndarray = np.zeros(shape=(0, 0, self.bin_edges.size - 1), dtype=np.int64)
+        self.bin_minimums: np.ndarray = np.zeros(shape=(0, 0, self.bin_edges.size - 1), dtype=np.int64)
+        self.bin_maximums: np.ndarray = np.zeros(shape=(0, 0, self.bin_edges.size - 1), dtype=np.int64)
+        self.settled_sums: np.ndarray = np.zeros(shape=0, dtype=np.float64)
+        self.settled_histograms: np.ndarray = np.zeros(shape=(0, self.bin_edges.size - 1), dtype=np.int64)
+        self.settled_bin_minimums: np.ndarray = np.zeros(shape=(0, self.bin_edges.size - 1), dtype=np.int64)
+        self.settled_bin_maximums: np.ndarray = np.zeros(shape=(0, self.bin_edges.size - 1), dtype=np.int64)
+
+    def get_bins(self, values: np.ndarray) -> np.ndarray:
+        """Get the histogram bin of every value."""
+        return np.clip(np.searchsorted(self.bin_edges, values, side='right') - 1, 0, self.bin_edges.size - 2)
+
+    def add(self, columns: list[str], rows: np.ndarray) -> None:
+        """Fold the rows of a finished run into this ensemble."""
+        if self.columns and columns != self.columns:
+            raise ValueError(f'Every run must save the same columns, expected {self.columns} but got {columns}.')
+        if not self.columns:
+            self.columns = columns
+            self.sums = np.zeros(shape=(0, len(columns) - 1), dtype=np.float64)
+            self.histograms = np.zeros(shape=(0, len(columns) - 1, self.bin_edges.size - 1), dtype=np.int64)
+            self.bin_minimums = np.zeros(shape=(0, len(columns) - 1, self.bin_edges.size - 1), dtype=np.int64)
+            self.bin_maximums = np.zeros(shape=(0, len(columns) - 1, self.bin_edges.size - 1), dtype=np.int64)
+            self.settled_sums = np.zeros(shape=len(columns) - 1, dtype=np.float64)
+            self.settled_histograms = np.zeros(shape=(len(columns) - 1, self.bin_edges.size - 1), dtype=np.int64)
+            # Empty bins are above every value and below every value.
+            self.settled_bin_minimums = np.full(shape=(len(columns) - 1, self.bin_edges.size - 1), fill_value=np.iinfo(np.int64).max)
+            self.settled_bin_maximums = np.full(shape=(len(columns) - 1, self.bin_edges.size - 1), fill_value=np.iinfo(np.int64).min)
+        # The iteration column is the same for every run, only the statistics are kept.
+        rows = rows[:, 1:]
+        iteration_amount, column_amount = self.sums.shape
+        if len(rows) > iteration_amount:
+            # Every run folded in so far is settled on the new iterations.
+            self.sums = np.concatenate((self.sums, np.repeat(self.settled_sums[np.newaxis], len(rows) - iteration_amount, axis=0)))
+            self.histograms = np.concatenate((self.histograms, np.repeat(self.settled_histograms[np.newaxis], len(rows) - iteration_amount, axis=0)))
+            self.bin_minimums = np.concatenate((self.bin_minimums, np.repeat(self.settled_bin_minimums[np.newaxis], len(rows) - iteration_amount, axis=0)))
+            self.bin_maximums = np.concatenate((self.bin_maximums, np.repeat(self.settled_bin_maximums[np.newaxis], len(rows) - iteration_amount, axis=0)))
+            iteration_amount = len(rows)
+        columns_range = np.arange(column_amount)
+        self.sums[:len(rows)] += rows
+        indexes = (np.arange(len(rows))[:, np.newaxis], columns_range, self.get_bins(values=rows))
+        np.add.at(self.histograms, indexes, 1)
+        np.minimum.at(self.bin_minimums, indexes, rows)
+        np.maximum.at(self.bin_maximums, indexes, rows)
+        # This run is settled on the remaining iterations, and on every new one.
+        last_row, last_bins = rows[-1], self.get_bins(values=rows[-1])
+        self.sums[len(rows):] += last_row
+        self.histograms[len(rows):, columns_range, last_bins] += 1
+        self.bin_minimums[len(rows):, columns_range, last_bins] = np.minimum(self.bin_minimums[len(rows):, columns_range, last_bins], last_row)
+        self.bin_maximums[len(rows):, columns_range, last_bins] = np.maximum(self.bin_maximums[len(rows):, columns_range, last_bins], last_row)
+        self.settled_sums += last_row
+        self.settled_histograms[columns_range, last_bins] += 1
+        self.settled_bin_minimums[columns_range, last_bins] = np.minimum(self.settled_bin_minimums[columns_range, last_bins], last_row)
+        self.settled_bin_maximums[columns_range, last_bins] = np.maximum(self.settled_bin_maximums[columns_range, last_bins], last_row)
+        self.run_amount += 1
+        del rows, columns_range, indexes, last_row, last_bins
+
+    def get_order_statistic(self, rank: int) -> np.ndarray:
+        """Get the value ranked some place (from 0, the smallest) among the runs, for every column at every iteration."""
+        cumulative_counts = np.cumsum(self.histograms, axis=2)
+        bins = np.minimum(np.count_nonzero(cumulative_counts <= rank, axis=2), self.bin_edges.size - 2)
+        counts = np.take_along_axis(self.histograms, bins[..., np.newaxis], axis=2)[..., 0]
+        previous_counts = np.take_along_axis(cumulative_counts, bins[..., np.newaxis], axis=2)[..., 0] - counts
+        minimums = np.take_along_axis(self.bin_minimums, bins[..., np.newaxis], axis=2)[..., 0]
+        maximums = np.take_along_axis(self.bin_maximums, bins[..., np.newaxis], axis=2)[..., 0]
+        # The values of a bin are spread evenly from the smallest to the largest one it got.
+        values = minimums + (rank - previous_counts) / np.maximum(counts - 1, 1) * (maximums - minimums)
+        del cumulative_counts, bins, counts, previous_counts, minimums, maximums
+        return values
+
+    def get_quantile(self, quantile: float) -> np.ndarray:
+        """Get a quantile of every column at every iteration, interpolated between order statistics as `np.quantile`."""
+        rank = quantile * (self.run_amount - 1)
+        lower_rank = int(np.floor(rank))
+        lower_values = self.get_order_statistic(rank=lower_rank)
+        upper_values = self.get_order_statistic(rank=min(lower_rank + 1, self.run_amount - 1))
+        return lower_values + (rank - lower_rank) * (upper_values - lower_values)
+
+    def summarize(self) -> tuple[list[str], np.ndarray]:
+        """Get the header and the rows of the aggregated curves."""
+        if not self.run_amount:
+            raise ValueError('At least one run is needed to summarize an ensemble.')
+        iteration_amount, column_amount = self.sums.shape
+        curves = [self.sums / self.run_amount] + [self.get_quantile(quantile=quantile) for quantile in self.quantiles]
+        header = ['Iteration'] + [f'{column}_{name}' for column in self.columns[1:] for name in ['mean', *(f'q{quantile * 100:g}' for quantile in self.quantiles)]]
+        # Interleave every curve, column by column, to match the header.
+        rows = np.column_stack([np.arange(iteration_amount)] + [curve[:, column] for column in range(column_amount) for curve in curves])
+        del curves
+        return header, rows
+
+    def save(self, data_file_path: str) -> None:
+        """Saves the aggregated curves in a .csv data file."""
+        header, rows = self.summarize()
+        with open(file=data_file_path, mode='w', encoding='utf-8') as file:
+            file.write(','.join(header) + '\n')
+            for row in rows:
+                file.write(f'{int(row[0])},' + ','.join(f'{value:.6g}' for value in row[1:]) + '\n')
+            file.close()
+
+
+def run_ensemble(
+    shape: int,
+    runs: int,
+    output_directory: str,
+    processes: int | None = None,
+    base_seed: int = 0,
+    max_steps: int | None = None,
+    immune_fraction: float = 0.05,
+    initial_infected: int = 1,
+    quantiles: tuple[float, ...] = (0.05, 0.5, 0.95),
+) -> str:
+    """Runs many seeded worlds of the same scenario across a process pool and aggregates them.
+
+    Parameters
+    ----------
+    shape : int
+        The amount of rows and columns of every world.
+    runs : int
+        The amount of worlds to run.
+    output_directory : str
+        Where every run data file and the aggregated data file are saved.
+    processes : int | None
+        The amount of worker processes, every available core if not specified.
+    base_seed : int
+        The seed every run seed is derived from.
+    max_steps : int | None
+        The maximum amount of iterations of every run.
+    immune_fraction : float
+        The fraction of the population that starts immune.
+    initial_infected : int
+        The amount of initially infected entities.
+    quantiles : tuple[float, ...]
+        Every quantile curve to compute, alongside the mean.
+
+    Returns
+    -------
+    str
+        The path of the aggregated data file.
+    """
+    os.makedirs(name=output_directory, exist_ok=True)
+    seeds = [int(seed_sequence.generate_state(n_words=1)[0]) for seed_sequence in np.random.SeedSequence(entropy=base_seed).spawn(n_children=runs)]
+    tasks = [
+        {
+            'shape': shape,
+            'immune_fraction': immune_fraction,
+            'initial_infected': initial_infected,
+            'seed': seed,
+            'max_steps': max_steps,
+            'data_file_path': os.path.join(output_directory, f'run_{index:04d}.csv'),
+        }
+        for index, seed in enumerate(seeds)
+    ]
+    aggregator = EnsembleAggregator(max_value=shape * shape, quantiles=quantiles)
+    with Pool(processes=processes) as pool:
+        for data_file_path in pool.imap_unordered(run_simulation, tasks):
+            aggregator.add(*read_data_file(data_file_path=data_file_path))
+    ensemble_data_file_path = os.path.join(output_directory, 'ensemble_data.csv')
+    aggregator.save(data_file_path=ensemble_data_file_path)
+    del seeds, tasks, aggregator
+    return ensemble_data_file_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Runs many seeded worlds in parallel and aggregates their statistics.')
+    parser.add_argument('--shape', type=int, default=500, help='The amount of rows and columns of every world.')
+    parser.add_argument('--runs', type=int, default=100, help='The amount of worlds to run.')
+    parser.add_argument('--output-directory', default='ensemble', help='Where every data file is saved.')
+    parser.add_argument('--processes', type=int, default=None, help='The amount of worker processes (every core by default).')
+    parser.add_argument('--seed', type=int, default=0, help='The seed every run seed is derived from.')
+    parser.add_argument('--max-steps', type=int, default=None, help='The maximum amount of iterations of every run.')
+    arguments = parser.parse_args()
+    print(run_ensemble(
+        shape=arguments.shape,
+        runs=arguments.runs,
+        output_directory=arguments.output_directory,
+        processes=arguments.processes,
+        base_seed=arguments.seed,
+        max_steps=arguments.max_steps,
+    ))
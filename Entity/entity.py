@@ -1,10 +1,10 @@
 """File responsible for everything related to an entity."""
 from typing import Callable, Any
-import numpy as np
 
 
 # pylint: disable=E0402
 from .entity_type import EntityType
+from .random_stream import RandomStream
 
 
 def ensure_alive(func) -> Callable[..., Any]:
@@ -18,6 +18,9 @@ def ensure_alive(func) -> Callable[..., Any]:
 class Entity:
     """Represents an entity, both healthy or infected."""
 
+    # The random stream shared by every entity that wasn't given its own.
+    random_stream: RandomStream = RandomStream()
+
     # If this entity is currently alive.
     is_alive: bool = True
 
@@ -43,7 +46,7 @@ class Entity:
     current_symptom_status: str = '' # The current symptom status of this entity.
 
 
-    def __init__(self, position: tuple[int, int], is_infected: bool, is_immune: bool) -> None:
+    def __init__(self, position: tuple[int, int], is_infected: bool, is_immune: bool, random_stream: RandomStream | None = None) -> None:
         """Initializes an entity at a specified position.
 
         Parameters
@@ -54,7 +57,11 @@ class Entity:
             If this entity is infected or not.
         is_immune : bool
             If this entity is immune or not.
+        random_stream : RandomStream | None
+            The random stream this entity draws from, the shared one if not specified.
         """
+        if random_stream is not None:
+            self.random_stream = random_stream
         self.position: tuple[int, int] = position
         self.is_infected: bool = is_infected if not is_immune else False
         self.is_immune: bool = is_immune if not is_infected else False
@@ -97,7 +104,7 @@ class Entity:
     def move_randomly(self, world_size: int) -> None:
         """Randomly move this entity to an adjacent position."""
         adjacent_offsets = ((1, 0), (-1, 0), (0, -1), (0, 1))
-        selected_offset = adjacent_offsets[int(np.random.randint(low=0, high=len(adjacent_offsets)))]
+        selected_offset = adjacent_offsets[self.random_stream.integer(high=len(adjacent_offsets))]
         next_position_x = (selected_offset[0] + self.position[0] + world_size) % world_size
         next_position_y = (selected_offset[1] + self.position[1] + world_size) % world_size
         del adjacent_offsets, selected_offset
@@ -111,17 +118,17 @@ class Entity:
     @ensure_alive
     def get_symptom_status(self) -> str:
         """Randomly choose the symptom status for this entity."""
-        return np.random.choice(a=self.all_symptoms_status, p=self.symptoms_probability)
+        return self.all_symptoms_status[self.random_stream.choose_index(probabilities=self.symptoms_probability)]
 
     @ensure_alive
     def get_mortality_status(self) -> str:
         """Randomly choose the mortality status for this entity."""
-        return np.random.choice(a=self.all_mortalities_status, p=self.mortalities_probability)
+        return self.all_mortalities_status[self.random_stream.choose_index(probabilities=self.mortalities_probability)]
 
     @ensure_alive
     def get_survival_status(self) -> None:
         """Randomly choose the survival status for this entity."""
-        return np.random.choice(a=self.all_survival_status, p=self.survival_probability)
+        return self.all_survival_status[self.random_stream.choose_index(probabilities=self.survival_probability)]
 
     @ensure_alive
     def get_infected(self) -> None:
@@ -139,7 +146,7 @@ class Entity:
                 self.heal()
             # 80% of dying if severe every iteration.
             if Entity.is_equal(entity_status=self.current_mortality_status, target_status='GRAVE'):
-                if np.random.random() > 0.2:
+                if self.random_stream.random() > 0.2:
                     self.die()
             self.life_span += 1
 
@@ -9,3 +9,11 @@ class EntityType(Enum):
     INFECTED: str = 'O' # type: ignore
     DEAD: str = '+' # type: ignore
     HEALED: str = '.' # type: ignore
+
+
+# The code of an empty tile in an entity type grid.
+EMPTY_TILE: int = 0
+
+# Every entity type, its code in an entity type grid is its index plus one.
+ENTITY_TYPES: tuple[EntityType, ...] = tuple(EntityType)
+ENTITY_TYPE_CODES: dict[EntityType, int] = {entity_type: code for code, entity_type in enumerate(ENTITY_TYPES, start=1)}
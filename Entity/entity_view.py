@@ -0,0 +1,54 @@
+"""File responsible for the entity view over an array-backed world."""
+from typing import Any
+
+
+# pylint: disable=E0402
+from .entity import Entity
+from .random_stream import RandomStream
+
+
+def tile_field(field: str) -> property:
+    """Creates a property that reads and writes one field of the viewed tile."""
+    def getter(self) -> Any:
+        return self.world.read_tile_field(position=self.position, field=field)
+
+    def setter(self, value: Any) -> None:
+        self.world.write_tile_field(position=self.position, field=field, value=value)
+
+    return property(fget=getter, fset=setter)
+
+
+class EntityView(Entity):
+    """Represents an entity whose state lives in the arrays of an array-backed world.
+
+    The view behaves exactly as an `Entity`, every state change made through it
+    is written back into the world arrays, so it can be discarded at any time.
+    """
+
+    is_alive = tile_field(field='alive')
+    is_infected = tile_field(field='infected')
+    is_immune = tile_field(field='immune')
+    life_span = tile_field(field='life_spans')
+    entity_type = tile_field(field='entity_types')
+    current_symptom_status = tile_field(field='symptom_statuses')
+    current_mortality_status = tile_field(field='mortality_statuses')
+    current_survival_status = tile_field(field='survival_statuses')
+
+    @property
+    def random_stream(self) -> RandomStream:
+        """The random stream of the world holding this entity."""
+        return self.world.random_stream
+
+    # pylint: disable=W0231
+    def __init__(self, world: Any, position: tuple[int, int]) -> None:
+        """Initializes a view over the entity at a specified position.
+
+        Parameters
+        ----------
+        world : ArrayWorld
+            The array-backed world holding this entity's state.
+        position : tuple[int, int]
+            The position where the entity is.
+        """
+        self.world = world
+        self.position: tuple[int, int] = position
@@ -0,0 +1,76 @@
+"""File responsible for handing out random numbers drawn in large blocks."""
+from bisect import bisect_right
+import numpy as np
+
+
+class RandomStream:
+    """Represents a seeded source of random numbers, drawn in blocks from a `np.random.Generator`.
+
+    Handing out one value from an already drawn block is much cheaper than one
+    NumPy call per value, which is what every entity needs most of the time.
+    """
+
+    def __init__(self, seed: int | None = None, block_size: int = 4096) -> None:
+        """Initializes a random stream.
+
+        Parameters
+        ----------
+        seed : int | None
+            The seed of the generator, the same seed always gives the same values.
+        block_size : int
+            How many random numbers are drawn at once.
+        """
+        self.generator: np.random.Generator = np.random.default_rng(seed=seed)
+        self.block_size: int = block_size
+        self.block: list[float] = []
+        self.cursor: int = 0
+        self.cumulative_tables: dict[tuple[float, ...], tuple[float, ...]] = {}
+
+    def refill(self) -> None:
+        """Draws a new block of random numbers."""
+        self.block = self.generator.random(size=self.block_size).tolist()
+        self.cursor = 0
+
+    def get_state(self) -> dict:
+        """Get the whole state of this stream, including the values not handed out yet."""
+        return {'bit_generator': self.generator.bit_generator.state, 'block_size': self.block_size, 'block': self.block[self.cursor:]}
+
+    def set_state(self, state: dict) -> None:
+        """Restore this stream to a state got from `get_state`."""
+        self.generator.bit_generator.state = state['bit_generator']
+        self.block_size = state['block_size']
+        self.block = list(state['block'])
+        self.cursor = 0
+
+    def random(self) -> float:
+        """Get a random number in [0, 1)."""
+        if self.cursor == len(self.block):
+            self.refill()
+        value = self.block[self.cursor]
+        self.cursor += 1
+        return value
+
+    def randoms(self, size: int | tuple[int, ...]) -> np.ndarray:
+        """Get an array of random numbers in [0, 1), drawn at once."""
+        return self.generator.random(size=size)
+
+    def integer(self, high: int) -> int:
+        """Get a random integer in [0, high)."""
+        return int(self.random() * high)
+
+    def cumulative_table(self, probabilities: list) -> tuple[float, ...]:
+        """Get the (cached) cumulative table of a list of probabilities."""
+        key = tuple(probabilities)
+        if key not in self.cumulative_tables:
+            cumulative_probabilities = np.cumsum(key)
+            self.cumulative_tables[key] = tuple((cumulative_probabilities / cumulative_probabilities[-1]).tolist())
+        return self.cumulative_tables[key]
+
+    def choose_index(self, probabilities: list) -> int:
+        """Randomly choose an index with the specified probabilities."""
+        return min(bisect_right(self.cumulative_table(probabilities=probabilities), self.random()), len(probabilities) - 1)
+
+    def choose_indexes(self, probabilities: list, draws: np.ndarray) -> np.ndarray:
+        """Turn already drawn random numbers into indexes chosen with the specified probabilities."""
+        indexes = np.searchsorted(self.cumulative_table(probabilities=probabilities), draws, side='right')
+        return np.minimum(indexes, len(probabilities) - 1)
@@ -0,0 +1,111 @@
+"""Module responsible for running every combination of a grid of simulation
+parameters in parallel, caching each finished run on disk by the hash of
+its configuration."""
+import hashlib
+import itertools
+import json
+import os
+from multiprocessing import Pool
+
+
+from Entity.entity import Entity
+from Ensemble.ensemble import run_simulation
+from World.array_world import MAX_INFECTION_DURATION
+
+
+# Every parameter of a simulation and its default value.
+DEFAULT_CONFIGURATION: dict = {
+    'shape': 500,
+    'seed': 0,
+    'max_steps': None,
+    'immune_fraction': 0.05,
+    'initial_infected': 1,
+    'infection_duration': Entity.infection_duration,
+    'symptomatic_probability': Entity.symptoms_probability[1],
+    'severe_probability': Entity.mortalities_probability[1],
+    'death_probability': Entity.survival_probability[1],
+}
+
+
+def check_configuration(configuration: dict) -> None:
+    """Check that every parameter of a configuration can be simulated."""
+    if not 0 <= configuration['infection_duration'] <= MAX_INFECTION_DURATION:
+        raise ValueError(f'The infection duration must be between 0 and {MAX_INFECTION_DURATION}, but got {configuration["infection_duration"]}.')
+
+
+def apply_epidemiological_parameters(configuration: dict) -> None:
+    """Set the `Entity` class attributes matching the epidemiological parameters of a configuration."""
+    check_configuration(configuration=configuration)
+    Entity.infection_duration = configuration['infection_duration']
+    Entity.symptoms_probability = [1 - configuration['symptomatic_probability'], configuration['symptomatic_probability']]
+    Entity.mortalities_probability = [1 - configuration['severe_probability'], configuration['severe_probability']]
+    Entity.survival_probability = [1 - configuration['death_probability'], configuration['death_probability']]
+
+
+def get_configuration_hash(configuration: dict) -> str:
+    """Get a short hash identifying a (complete) configuration."""
+    return hashlib.sha256(json.dumps(obj=configuration, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def expand_grid(grid: dict[str, list], base_configuration: dict | None = None) -> list[dict]:
+    """Get every combination of the values of a grid, over a base configuration (the defaults if not specified)."""
+    base_configuration = {**DEFAULT_CONFIGURATION, **(base_configuration or {})}
+    unknown_parameters = set(grid) - set(base_configuration)
+    if unknown_parameters:
+        raise ValueError(f'Unknown parameters {sorted(unknown_parameters)}, expected some of {sorted(base_configuration)}.')
+    configurations = [{**base_configuration, **dict(zip(grid, values))} for values in itertools.product(*grid.values())]
+    for configuration in configurations:
+        check_configuration(configuration=configuration)
+    return configurations
+
+
+def run_configuration(task: tuple[dict, str]) -> tuple[dict, str, bool]:
+    """Run the world of a configuration, unless a previous sweep already did, and get its data file path and if it was cached."""
+    configuration, directory = task
+    configuration_hash = get_configuration_hash(configuration=configuration)
+    data_file_path = os.path.join(directory, f'{configuration_hash}.csv')
+    if os.path.exists(data_file_path):
+        return configuration, data_file_path, True
+    apply_epidemiological_parameters(configuration=configuration)
+    # The run is written aside and renamed once finished, so an interrupted run is never cached.
+    partial_data_file_path = run_simulation(task={
+        'shape': configuration['shape'],
+        'immune_fraction': configuration['immune_fraction'],
+        'initial_infected': configuration['initial_infected'],
+        'seed': configuration['seed'],
+        'max_steps': configuration['max_steps'],
+        'data_file_path': f'{data_file_path}.partial',
+    })
+    with open(file=os.path.join(directory, f'{configuration_hash}.json'), mode='w', encoding='utf-8') as file:
+        json.dump(obj=configuration, fp=file, indent=2)
+        file.close()
+    os.replace(src=partial_data_file_path, dst=data_file_path)
+    return configuration, data_file_path, False
+
+
+def run_sweep(grid: dict[str, list], directory: str, base_configuration: dict | None = None, processes: int | None = None) -> list[tuple[dict, str, bool]]:
+    """Run every combination of a grid of parameters across a process pool, skipping the ones already cached.
+
+    Parameters
+    ----------
+    grid : dict[str, list]
+        Every swept parameter (see `DEFAULT_CONFIGURATION`) and its values.
+    directory : str
+        Where the data file (and configuration) of every run is cached, named by its configuration hash.
+    base_configuration : dict | None
+        The value of every parameter that is not swept, the defaults if not specified.
+    processes : int | None
+        The amount of worker processes, every available core if not specified.
+
+    Returns
+    -------
+    list[tuple[dict, str, bool]]
+        The configuration, data file path and if it was cached of every run, in the grid order.
+    """
+    os.makedirs(name=directory, exist_ok=True)
+    tasks = [(configuration, directory) for configuration in expand_grid(grid=grid, base_configuration=base_configuration)]
+    # Every run sets all the epidemiological parameters of its worker, so workers can be reused.
+    with Pool(processes=processes) as pool:
+        results = pool.map(run_configuration, tasks, chunksize=1)
+    del tasks
+    return results
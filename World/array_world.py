@@ -0,0 +1,557 @@
+"""Module responsible for an array-backed world, where every entity
+state is stored in compact arrays instead of one object per tile."""
+import os
+from typing import Any
+import numpy as np
+
+
+from Entity.entity import Entity
+from Entity.entity_type import EMPTY_TILE, ENTITY_TYPE_CODES, ENTITY_TYPES, EntityType
+from Entity.entity_view import EntityView
+from World.checkpoint import CHECKPOINT_PREFIX, load_checkpoint, prune_checkpoints, save_checkpoint
+from World.event_log import EventLog
+from World.infected_index import InfectedIndex
+from World.population_counters import PopulationCounters
+from World.swap_sequence import SwapSequence
+from World.world import World
+
+
+# Every possible value of each status field, its code is its index ('' means no status yet).
+STATUS_VALUES: dict[str, tuple[str, ...]] = {
+    'symptom_statuses': ('', *Entity.all_symptoms_status),
+    'mortality_statuses': ('', *Entity.all_mortalities_status),
+    'survival_statuses': ('', *Entity.all_survival_status),
+}
+
+# Every per-tile field and its data type.
+TILE_FIELDS: dict[str, type] = {
+    'entity_types': np.uint8,
+    'life_spans': np.uint16,
+    'symptom_statuses': np.uint8,
+    'mortality_statuses': np.uint8,
+    'survival_statuses': np.uint8,
+    'alive': np.bool_,
+    'infected': np.bool_,
+    'immune': np.bool_,
+}
+
+# The longest infection duration life spans can hold, as an infected entity's life span reaches the duration plus one.
+MAX_INFECTION_DURATION: int = int(np.iinfo(TILE_FIELDS['life_spans']).max) - 1
+
+
+# Every adjacent offset an entity can reach, in the same order used by `Entity`.
+ADJACENT_OFFSETS: np.ndarray = np.array(object=((1, 0), (-1, 0), (0, -1), (0, 1)), dtype=np.int64)
+
+# A severe entity survives an iteration when its draw is at most this value.
+SEVERE_SURVIVAL_THRESHOLD: float = 0.2
+
+# Random numbers drawn per infected entity on a batched iteration: one to
+# decide its death, one for its move and three statuses for each of the
+# (up to) four neighbors it may infect.
+RANDOMS_PER_INFECTED: int = 2 + 3 * len(ADJACENT_OFFSETS)
+
+
+def get_status_code(field: str, status: str) -> int:
+    """Get the code of a status in a status field."""
+    return STATUS_VALUES[field].index(status)
+
+
+class ArrayWorld(World):
+    """Represents a world with random living entities, stored as a struct of arrays.
+
+    Each tile state is split in one array per field (see `TILE_FIELDS`), an
+    `EntityView` is only built when a single tile is requested.
+    """
+
+    # Every per-tile field of this world, moved along with its entity on a swap.
+    tile_fields: dict[str, type] = TILE_FIELDS
+
+    # Every how many iterations a checkpoint is saved (never if 0), where, and how many are kept.
+    checkpoint_every: int = 0
+    checkpoint_directory: str = 'checkpoints'
+    checkpoint_retention: int = 3
+
+    # The log of every tile changed by each iteration, if recorded.
+    event_log: EventLog | None = None
+
+    # The views over the entities stepped by a per-entity iteration, by flat position, moved along with their entity.
+    followed_views: dict[int, EntityView] | None = None
+
+    def __init__(self, shape: int, immune_fraction: float = 0.05, initial_infected: int = 1, seed: int | None = None, data_file_path: str | None = 'world_data.csv', batched: bool = False, check_counters: bool = False) -> None:
+        """Initializes an array-backed world.
+
+        Parameters
+        ----------
+        shape : int
+            The amount of rows and columns of this world.
+        immune_fraction : float
+            The fraction of the (not initially infected) population that is immune.
+        initial_infected : int
+            The amount of initially infected entities.
+        seed : int | None
+            The seed of every random number drawn by this world and its entities.
+        data_file_path : str | None
+            The path of the data file where every iteration state is saved, a
+            .npy file is written in binary, None writes no file.
+        batched : bool
+            If every iteration should be computed with whole-array operations
+            instead of stepping each infected entity one at a time.
+        check_counters : bool
+            If the population counters should be checked against a full scan
+            of the world every time the state is saved (debug mode).
+        """
+        self.batched: bool = batched
+        self.check_counters: bool = check_counters
+        super().__init__(shape=shape, immune_fraction=immune_fraction, initial_infected=initial_infected, seed=seed, data_file_path=data_file_path)
+
+    def create_tiles(self) -> None:
+        """Creates one empty array per tile field for this world."""
+        for field, dtype in self.tile_fields.items():
+            setattr(self, field, self.allocate_field(field=field, dtype=dtype))
+        self.alive.fill(True)
+        # Every tile starts empty.
+        self.counters: PopulationCounters = self.create_counters()
+        self.counters.entity_types[EMPTY_TILE] = self.entity_types.size
+        self.infected_index: InfectedIndex = InfectedIndex()
+
+    def allocate_field(self, field: str, dtype: type) -> np.ndarray:
+        """Allocates a zeroed array with the world shape for a tile field."""
+        return np.zeros(shape=self.shape, dtype=dtype)
+
+    def to_flat_positions(self, positions: Any) -> np.ndarray:
+        """Convert one or many (x, y) positions into flat tile indexes."""
+        if isinstance(positions, tuple) and isinstance(positions[0], (int, np.integer)):
+            # A single position, as read and written by every entity view.
+            return int(positions[0]) * self.shape[1] + int(positions[1])
+        positions = np.asarray(positions, dtype=np.int64)
+        return positions[..., 0] * self.shape[1] + positions[..., 1]
+
+    def offset_flat_positions(self, flat_positions: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+        """Calculates every flat position plus its offset in a circular world."""
+        rows, cols = self.shape
+        position_x, position_y = np.divmod(flat_positions, cols)
+        position_x = (offsets[..., 0] + position_x + rows) % rows
+        position_y = (offsets[..., 1] + position_y + cols) % cols
+        return position_x * cols + position_y
+
+    def to_positions(self, flat_positions: np.ndarray) -> tuple[tuple[int, int], ...]:
+        """Convert flat tile indexes into (x, y) positions."""
+        rows, cols = np.divmod(flat_positions, self.shape[1])
+        return tuple(zip(rows.tolist(), cols.tolist()))
+
+    def gather(self, field: str, flat_positions: np.ndarray) -> np.ndarray:
+        """Read a field at every specified flat position."""
+        return getattr(self, field).ravel()[flat_positions]
+
+    def scatter(self, field: str, flat_positions: np.ndarray, values: Any) -> None:
+        """Write a field at every specified flat position."""
+        getattr(self, field).ravel()[flat_positions] = values
+        if self.event_log is not None:
+            self.event_log.touch(flat_positions=flat_positions)
+
+    def count_tiles(self, flat_positions: np.ndarray, sign: int = 1) -> None:
+        """Add (or remove, with a negative sign) the tiles at every flat position from the population counters."""
+        self.counters.add(
+            entity_types=self.gather(field='entity_types', flat_positions=flat_positions),
+            statuses={field: self.gather(field=field, flat_positions=flat_positions) for field in STATUS_VALUES},
+            is_counted=self.gather(field='infected', flat_positions=flat_positions) & self.gather(field='alive', flat_positions=flat_positions),
+            sign=sign,
+        )
+
+    def count_tile(self, flat_position: int, sign: int = 1) -> None:
+        """Add (or remove, with a negative sign) the single tile at a flat position from the population counters."""
+        self.counters.entity_types[self.gather(field='entity_types', flat_positions=flat_position)] += sign
+        if self.gather(field='infected', flat_positions=flat_position) and self.gather(field='alive', flat_positions=flat_position):
+            for field, counter in self.counters.statuses.items():
+                counter[self.gather(field=field, flat_positions=flat_position)] += sign
+
+    def index_tiles(self, flat_positions: np.ndarray) -> None:
+        """Update the infected index with the tiles at every flat position."""
+        is_infected = self.gather(field='entity_types', flat_positions=flat_positions) == ENTITY_TYPE_CODES[EntityType.INFECTED]
+        self.infected_index.update(flat_positions=flat_positions, is_infected=is_infected)
+        del is_infected
+
+    def set_checkpoints(self, directory: str, every: int, retention: int = 3) -> None:
+        """Save a checkpoint in a directory every some iterations, keeping only the most recent ones.
+
+        Parameters
+        ----------
+        directory : str
+            The directory holding every checkpoint, one sub-directory per iteration.
+        every : int
+            Every how many iterations a checkpoint is saved, 0 to stop saving them.
+        retention : int
+            How many of the most recent checkpoints are kept.
+        """
+        self.checkpoint_directory = directory
+        self.checkpoint_every = every
+        self.checkpoint_retention = retention
+
+    def record_events(self, directory: str, keyframe_every: int = 100) -> None:
+        """Log every tile changed by each iteration in a directory, so any iteration can be replayed (see `EventLogReader`).
+
+        Parameters
+        ----------
+        directory : str
+            The directory of the log files and keyframes.
+        keyframe_every : int
+            Every how many iterations the whole world is saved, replays start
+            from the nearest previous one. 0 only saves the initial world, the
+            smallest log but the longest replays.
+        """
+        if self.event_log is not None:
+            self.event_log.close()
+        self.event_log = EventLog(directory=directory, world=self, keyframe_every=keyframe_every)
+
+    def flush(self) -> None:
+        """Writes every pending statistics row, frame and event, keeping this world's output open."""
+        super().flush()
+        if self.event_log is not None:
+            self.event_log.flush()
+
+    def close(self) -> None:
+        """Writes every pending statistics row, frame and event and releases this world's output."""
+        super().close()
+        if self.event_log is not None:
+            self.event_log.close()
+            self.event_log = None
+
+    def save_checkpoint(self, directory: str) -> None:
+        """Save the whole state of this world in a checkpoint directory, once its output caught up with it."""
+        # A run resumed from this checkpoint must not miss any row, frame or event of the previous iterations.
+        self.flush()
+        save_checkpoint(world=self, directory=directory)
+
+    @classmethod
+    def load_checkpoint(cls, directory: str, data_file_path: str | None = None, mmap_mode: str | None = 'c') -> 'ArrayWorld':
+        """Load a world from a checkpoint directory, its tile arrays are memory-mapped by default.
+
+        Parameters
+        ----------
+        directory : str
+            The checkpoint directory.
+        data_file_path : str | None
+            The data file where the statistics of the resumed world are saved.
+        mmap_mode : str | None
+            How the tile arrays are memory-mapped (see `np.load`), by default
+            they are read lazily and changes never reach the checkpoint, None
+            reads them in memory.
+        """
+        return load_checkpoint(directory=directory, world_class=cls, data_file_path=data_file_path, mmap_mode=mmap_mode)
+
+    def create_counters(self) -> PopulationCounters:
+        """Creates population counters for every entity type and status code, all at zero."""
+        return PopulationCounters(entity_type_amount=len(ENTITY_TYPES) + 1, status_amounts={field: len(values) for field, values in STATUS_VALUES.items()})
+
+    def scan_counters(self) -> PopulationCounters:
+        """Count every tile of this world into new population counters (full scan)."""
+        counters = self.create_counters()
+        counters.add(entity_types=self.entity_types, statuses={field: getattr(self, field) for field in STATUS_VALUES}, is_counted=self.infected & self.alive)
+        return counters
+
+    def verify_counters(self) -> None:
+        """Check the population counters and the infected index against a full scan of this world."""
+        if self.counters != self.scan_counters():
+            raise RuntimeError(f'Population counters diverged from the world state at iteration {self.iteration_step}.')
+        if not np.array_equal(self.infected_index.to_array(), np.flatnonzero(self.entity_types == ENTITY_TYPE_CODES[EntityType.INFECTED])):
+            raise RuntimeError(f'Infected index diverged from the world state at iteration {self.iteration_step}.')
+
+    def read_tile_field(self, position: tuple[int, int], field: str) -> Any:
+        """Read and decode a single field of the tile at a position."""
+        value = self.gather(field=field, flat_positions=self.to_flat_positions(position))
+        if field == 'entity_types':
+            return ENTITY_TYPES[int(value) - 1] if value != EMPTY_TILE else None
+        if field in STATUS_VALUES:
+            return STATUS_VALUES[field][int(value)]
+        if field == 'life_spans':
+            return int(value)
+        return bool(value)
+
+    def write_tile_field(self, position: tuple[int, int], field: str, value: Any) -> None:
+        """Encode and write a single field of the tile at a position."""
+        if field == 'entity_types':
+            value = ENTITY_TYPE_CODES[value]
+        elif field in STATUS_VALUES:
+            value = get_status_code(field=field, status=value)
+        flat_position = self.to_flat_positions(position)
+        if field == 'life_spans':
+            self.scatter(field=field, flat_positions=flat_position, values=value)
+            return
+        self.count_tile(flat_position=flat_position, sign=-1)
+        self.scatter(field=field, flat_positions=flat_position, values=value)
+        self.count_tile(flat_position=flat_position)
+        if field == 'entity_types':
+            self.index_tiles(flat_positions=flat_position)
+        del flat_position
+
+    def store_entity(self, position: tuple[int, int], entity: Entity) -> None:
+        """Copy the whole state of an entity into the tile at a position."""
+        view = EntityView(world=self, position=position)
+        view.entity_type = entity.entity_type
+        view.is_alive = entity.is_alive
+        view.is_infected = entity.is_infected
+        view.is_immune = entity.is_immune
+        view.life_span = entity.life_span
+        view.current_symptom_status = entity.current_symptom_status
+        view.current_mortality_status = entity.current_mortality_status
+        view.current_survival_status = entity.current_survival_status
+        del view
+
+    def get_entity_type_codes(self) -> np.ndarray:
+        """Get a grid with the entity type code of every tile in this world."""
+        return self.entity_types
+
+    def get_tile(self, position: tuple[int, int]) -> EntityView:
+        """Get a view over the entity at a specified tile by its position."""
+        return EntityView(world=self, position=position)
+
+    def swap_tiles(self, old_pos: tuple[int, int], new_pos: tuple[int, int]) -> None:
+        """Swap the information between two tiles in this world, the followed views knowing their new position."""
+        old_flat_position, new_flat_position = self.to_flat_positions(old_pos), self.to_flat_positions(new_pos)
+        # Single tiles are read and written as scalars, much cheaper than two-tile arrays.
+        for field in self.tile_fields:
+            old_value = self.gather(field=field, flat_positions=old_flat_position)
+            self.scatter(field=field, flat_positions=old_flat_position, values=self.gather(field=field, flat_positions=new_flat_position))
+            self.scatter(field=field, flat_positions=new_flat_position, values=old_value)
+        self.index_tiles(flat_positions=np.array(object=(old_flat_position, new_flat_position), dtype=np.int64))
+        if self.followed_views:
+            old_view, new_view = self.followed_views.pop(old_flat_position, None), self.followed_views.pop(new_flat_position, None)
+            if old_view is not None:
+                old_view.position = new_pos
+                self.followed_views[new_flat_position] = old_view
+            if new_view is not None:
+                new_view.position = old_pos
+                self.followed_views[old_flat_position] = new_view
+            del old_view, new_view
+        del old_flat_position, new_flat_position
+
+    def update_tile(self, position: tuple[int, int], is_infected: bool, is_immune: bool) -> None:
+        """Spawn a new entity in a tile."""
+        self.store_entity(position=position, entity=Entity(position=position, is_infected=is_infected, is_immune=is_immune, random_stream=self.random_stream))
+
+    def is_tile_empty(self, position: tuple[int, int]) -> bool:
+        """Check if a tile at position is an empty tile."""
+        return self.entity_types[position] == EMPTY_TILE
+
+    def count_status(self, field: str, target_status: str) -> int:
+        """Count the amount of a target status in a status field for every infected entity in the world."""
+        return int(self.counters.statuses[field][get_status_code(field=field, status=target_status)])
+
+    def count_entity_type(self, target_entity_type: EntityType) -> int:
+        """Count the amount of entities of a target entity type in this world."""
+        return int(self.counters.entity_types[ENTITY_TYPE_CODES[target_entity_type]])
+
+    def count_symptom_status(self, target_symptom_status: str) -> int:
+        """Count the amount of a target symptom status for every infected entity in the world."""
+        return self.count_status(field='symptom_statuses', target_status=target_symptom_status)
+
+    def count_mortality_status(self, target_mortality_status: str) -> int:
+        """Count the amount of a target mortality status for every infected entity in the world."""
+        return self.count_status(field='mortality_statuses', target_status=target_mortality_status)
+
+    def count_survival_status(self, target_survival_status: str) -> int:
+        """Count the amount of a target survival status for every infected entity in the world."""
+        return self.count_status(field='survival_statuses', target_status=target_survival_status)
+
+    def scanned_tile_amount(self) -> int:
+        """Get how many tiles are visited to find the infected entities, only the indexed ones."""
+        return len(self.infected_index)
+
+    def get_infected_positions(self) -> tuple[tuple[int, int], ...]:
+        """Get the position of every infected entity in this world, from the infected index."""
+        return self.to_positions(flat_positions=self.infected_index.to_array())
+
+    def get_infected_entities(self) -> list[EntityView]:
+        """Get a view over every infected entity in this world, followed until the next one is requested."""
+        flat_positions = self.infected_index.to_array()
+        self.followed_views = {flat_position: EntityView(world=self, position=position) for flat_position, position in zip(flat_positions.tolist(), self.to_positions(flat_positions=flat_positions))}
+        del flat_positions
+        return list(self.followed_views.values())
+
+    def get_matching_entity_type_positions(self, target_entity_type: object) -> tuple[tuple[int, int], ...]:
+        """Get the position of every matching entity type in this world."""
+        flat_positions = np.flatnonzero(self.entity_types == ENTITY_TYPE_CODES[target_entity_type])
+        positions = self.to_positions(flat_positions=flat_positions)
+        del flat_positions
+        return positions
+
+    def add_immune_entities(self, flat_positions: np.ndarray) -> None:
+        """Transform the entities at every flat position into immune healthy entities."""
+        self.count_tiles(flat_positions=flat_positions, sign=-1)
+        self.scatter(field='immune', flat_positions=flat_positions, values=True)
+        self.scatter(field='entity_types', flat_positions=flat_positions, values=ENTITY_TYPE_CODES[EntityType.IMMUNE])
+        self.count_tiles(flat_positions=flat_positions)
+
+    def add_infected_entities(self, flat_positions: np.ndarray) -> None:
+        """Transform the entities at every flat position into infected entities."""
+        self.infect_tiles(flat_positions=flat_positions, status_draws=self.random_stream.randoms(size=(3, flat_positions.size)))
+
+    def add_healthy_entities(self) -> None:
+        """Transform every other empty tile into a healthy entity."""
+        self.entity_types[self.entity_types == EMPTY_TILE] = ENTITY_TYPE_CODES[EntityType.HEALTHY]
+        self.counters.move(old_entity_type=EMPTY_TILE, new_entity_type=ENTITY_TYPE_CODES[EntityType.HEALTHY], amount=self.counters.entity_types[EMPTY_TILE])
+
+    def save_state(self) -> None:
+        """Saves the current world state in this world's statistics sink."""
+        if self.check_counters:
+            self.verify_counters()
+        super().save_state()
+
+    def next_iteration(self) -> None:
+        """Step into the next world iteration, logging its changes and saving a checkpoint if one is due."""
+        if self.batched:
+            self.next_batched_iteration()
+        else:
+            super().next_iteration()
+            self.followed_views = None
+        if self.event_log is not None:
+            self.event_log.end_iteration(world=self)
+        if self.checkpoint_every and self.iteration_step % self.checkpoint_every == 0:
+            self.save_checkpoint(directory=os.path.join(self.checkpoint_directory, f'{CHECKPOINT_PREFIX}{self.iteration_step:08d}'))
+            prune_checkpoints(directory=self.checkpoint_directory, retention=self.checkpoint_retention)
+
+    def next_batched_iteration(self) -> None:
+        """Step into the next world iteration, with whole-array operations: every infected entity ticks and then gets stepped (see `step_infected_tiles`)."""
+        profiler = self.profiler
+        self.save_state()
+        if profiler is not None:
+            profiler.start_phase(phase='scan')
+        infected_positions = self.infected_index.to_array()
+        if profiler is not None:
+            profiler.end_phase(phase='scan', cells=infected_positions.size)
+            profiler.start_phase(phase='sampling')
+        draws = self.random_stream.randoms(size=(RANDOMS_PER_INFECTED, infected_positions.size))
+        if profiler is not None:
+            profiler.end_phase(phase='sampling', cells=infected_positions.size)
+            profiler.start_phase(phase='transition')
+        self.increase_life_spans(infected_positions=infected_positions, death_draws=draws[0])
+        if profiler is not None:
+            profiler.end_phase(phase='transition', cells=infected_positions.size)
+        self.step_infected_tiles(infected_positions=infected_positions, move_draws=draws[1], status_draws=draws[2:].reshape(3, -1))
+        del infected_positions, draws
+        self.iteration_step += 1
+        if profiler is not None:
+            profiler.end_iteration(iteration=self.iteration_step)
+
+    def increase_life_spans(self, infected_positions: np.ndarray, death_draws: np.ndarray) -> None:
+        """Increase the life span of every infected entity, healing or killing them as `Entity.increase_life_span`."""
+        life_spans = self.gather(field='life_spans', flat_positions=infected_positions)
+        self.count_tiles(flat_positions=infected_positions, sign=-1)
+        healed_positions = infected_positions[life_spans >= Entity.infection_duration]
+        self.scatter(field='infected', flat_positions=healed_positions, values=False)
+        self.scatter(field='immune', flat_positions=healed_positions, values=True)
+        self.scatter(field='entity_types', flat_positions=healed_positions, values=ENTITY_TYPE_CODES[EntityType.HEALED])
+        # Severe entities can die every iteration, even when they were just healed.
+        is_severe = self.gather(field='mortality_statuses', flat_positions=infected_positions) == get_status_code(field='mortality_statuses', status='GRAVE')
+        dead_positions = infected_positions[is_severe & (death_draws > SEVERE_SURVIVAL_THRESHOLD)]
+        self.scatter(field='alive', flat_positions=dead_positions, values=False)
+        self.scatter(field='entity_types', flat_positions=dead_positions, values=ENTITY_TYPE_CODES[EntityType.DEAD])
+        self.scatter(field='life_spans', flat_positions=infected_positions, values=life_spans + 1)
+        self.count_tiles(flat_positions=infected_positions)
+        self.index_tiles(flat_positions=infected_positions)
+        del life_spans, healed_positions, is_severe, dead_positions
+
+    def infect_neighbor_tiles(self, infected_positions: np.ndarray, status_draws: np.ndarray) -> None:
+        """Infect every entity adjacent to the infected entities, as `Entity.get_infected`."""
+        neighbor_positions = np.unique(self.offset_flat_positions(flat_positions=infected_positions[:, np.newaxis], offsets=ADJACENT_OFFSETS))
+        # Only entities that are neither immune nor infected can get infected.
+        is_susceptible = ~(self.gather(field='immune', flat_positions=neighbor_positions) | self.gather(field='infected', flat_positions=neighbor_positions))
+        self.infect_tiles(flat_positions=neighbor_positions[is_susceptible], status_draws=status_draws)
+        del neighbor_positions, is_susceptible
+
+    def draw_status_codes(self, probabilities: list, draws: np.ndarray) -> np.ndarray:
+        """Turn already drawn random numbers into status codes chosen with the specified probabilities."""
+        return self.random_stream.choose_indexes(probabilities=probabilities, draws=draws).astype(np.uint8) + 1
+
+    def infect_tiles(self, flat_positions: np.ndarray, status_draws: np.ndarray) -> None:
+        """Infect the entities at every flat position, drawing their statuses as `Entity.define_infected_entity_status`."""
+        symptom_draws, mortality_draws, survival_draws = status_draws[:, :flat_positions.size]
+        self.count_tiles(flat_positions=flat_positions, sign=-1)
+
+        # Only 'SINTOMÁTICO' entities have a mortality status and only 'GRAVE' ones a survival status.
+        symptom_codes = self.draw_status_codes(probabilities=Entity.symptoms_probability, draws=symptom_draws)
+        mortality_codes = self.draw_status_codes(probabilities=Entity.mortalities_probability, draws=mortality_draws)
+        mortality_codes[symptom_codes != get_status_code(field='symptom_statuses', status='SINTOMÁTICO')] = 0
+        survival_codes = self.draw_status_codes(probabilities=Entity.survival_probability, draws=survival_draws)
+        survival_codes[mortality_codes != get_status_code(field='mortality_statuses', status='GRAVE')] = 0
+        is_dead = survival_codes == get_status_code(field='survival_statuses', status='MORTE')
+
+        self.scatter(field='infected', flat_positions=flat_positions, values=True)
+        self.scatter(field='symptom_statuses', flat_positions=flat_positions, values=symptom_codes)
+        self.scatter(field='mortality_statuses', flat_positions=flat_positions, values=mortality_codes)
+        self.scatter(field='survival_statuses', flat_positions=flat_positions, values=survival_codes)
+        self.scatter(field='alive', flat_positions=flat_positions, values=~is_dead)
+        entity_type_codes = np.where(is_dead, ENTITY_TYPE_CODES[EntityType.DEAD], ENTITY_TYPE_CODES[EntityType.INFECTED])
+        self.scatter(field='entity_types', flat_positions=flat_positions, values=entity_type_codes)
+        self.count_tiles(flat_positions=flat_positions)
+        self.index_tiles(flat_positions=flat_positions)
+        del symptom_codes, mortality_codes, survival_codes, is_dead, entity_type_codes
+
+    def step_infected_tiles(self, infected_positions: np.ndarray, move_draws: np.ndarray, status_draws: np.ndarray) -> None:
+        """Step every (already ticked) infected entity in order, as `World.next_iteration`: each one infects its neighbors and moves.
+
+        Every entity moves from where it stands at its turn, once every
+        earlier entity moved (see `find_moves`), and infects the neighbors of
+        that position: an entity only gets displaced by a neighbor moving into
+        its tile, which infected it just before, so every entity that can
+        still get infected stands where it started and infecting the
+        neighbors of every turn position before moving anyone infects the
+        same entities. Every move is then applied at once, as the tile each
+        moved entity ends up at.
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start_phase(phase='movement')
+        offsets = ADJACENT_OFFSETS[(move_draws * len(ADJACENT_OFFSETS)).astype(np.int64)]
+        moves = self.find_moves(infected_positions=infected_positions, offsets=offsets)
+        if profiler is not None:
+            profiler.end_phase(phase='movement')
+            profiler.start_phase(phase='infection')
+        self.infect_neighbor_tiles(infected_positions=moves.old_positions, status_draws=status_draws)
+        if profiler is not None:
+            profiler.end_phase(phase='infection', cells=infected_positions.size * len(ADJACENT_OFFSETS))
+            profiler.start_phase(phase='movement')
+        moved_positions = np.unique(np.concatenate((moves.old_positions, moves.new_positions)))
+        self.move_flat_tiles(old_positions=moved_positions, new_positions=moves.follow(positions=moved_positions, end_swaps=np.full(shape=moved_positions.size, fill_value=len(moves)))[0])
+        if profiler is not None:
+            profiler.end_phase(phase='movement', cells=2 * infected_positions.size)
+        del offsets, moves, moved_positions
+
+    def find_moves(self, infected_positions: np.ndarray, offsets: np.ndarray) -> SwapSequence:
+        """Get the move of every infected entity, from where it stands at its turn once every earlier one moved.
+
+        Every entity is first guessed to stand where it starts, every guess is
+        then refined by following its entity through the earlier moves, as the
+        last guesses made them, until no guess changes. A guess only depends
+        on the earlier ones, so it's exact once they are, and only changes
+        when a move changed on a tile its entity went through: only those
+        entities are followed again. It takes about as many passes as the
+        longest chain of entities displacing each other.
+        """
+        entities = np.arange(infected_positions.size)
+        moves = SwapSequence(old_positions=infected_positions, new_positions=self.offset_flat_positions(flat_positions=infected_positions, offsets=offsets))
+        followed, visitors, visited_tiles = entities, entities[:0], infected_positions[:0]
+        while followed.size:
+            turn_positions, followed_visitors, followed_visited_tiles = moves.follow(positions=infected_positions[followed], end_swaps=followed)
+            is_followed = np.zeros(shape=entities.size, dtype=np.bool_)
+            is_followed[followed] = True
+            is_kept = ~is_followed[visitors]
+            visitors = np.concatenate((visitors[is_kept], followed[followed_visitors]))
+            visited_tiles = np.concatenate((visited_tiles[is_kept], followed_visited_tiles))
+            is_changed = turn_positions != moves.old_positions[followed]
+            changed, turn_positions = followed[is_changed], turn_positions[is_changed]
+            changed_tiles = np.concatenate((moves.old_positions[changed], moves.new_positions[changed]))
+            moves.replace(swaps=changed, old_positions=turn_positions, new_positions=self.offset_flat_positions(flat_positions=turn_positions, offsets=offsets[changed]))
+            changed_tiles = np.concatenate((changed_tiles, moves.old_positions[changed], moves.new_positions[changed]))
+            # Only the entities after a changed move can be displaced by it.
+            followed = np.unique(visitors[np.isin(visited_tiles, changed_tiles)])
+            followed = followed[followed > changed.min(initial=entities.size)]
+            del turn_positions, followed_visitors, followed_visited_tiles, is_followed, is_kept, is_changed, changed, changed_tiles
+        del entities, followed, visitors, visited_tiles
+        return moves
+
+    def move_flat_tiles(self, old_positions: np.ndarray, new_positions: np.ndarray) -> None:
+        """Move the information of many tiles in this world, the new flat positions being the old ones in any order."""
+        for field in self.tile_fields:
+            self.scatter(field=field, flat_positions=new_positions, values=self.gather(field=field, flat_positions=old_positions))
+        self.index_tiles(flat_positions=new_positions)
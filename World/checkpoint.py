@@ -0,0 +1,103 @@
+"""Module responsible for saving and loading the whole state of an
+array-backed world, as a directory of memory-mappable .npy files."""
+import json
+import os
+import shutil
+from typing import Any
+import numpy as np
+
+
+from Entity.random_stream import RandomStream
+from World.infected_index import InfectedIndex
+
+
+# The prefix of every periodic checkpoint directory, followed by its iteration.
+CHECKPOINT_PREFIX: str = 'iteration_'
+
+# The file holding everything but the tile arrays.
+METADATA_FILE_NAME: str = 'metadata.json'
+
+
+def save_checkpoint(world: Any, directory: str) -> None:
+    """Save the whole state of an array-backed world in a checkpoint directory.
+
+    Every tile field goes to its own .npy file, so it can be memory-mapped when
+    loaded. The checkpoint is written aside and renamed once complete, so a
+    crash while saving never leaves a partial checkpoint behind.
+    """
+    temporary_directory = f'{directory.rstrip(os.sep)}.partial'
+    shutil.rmtree(path=temporary_directory, ignore_errors=True)
+    os.makedirs(name=temporary_directory)
+    for field in world.tile_fields:
+        np.save(file=os.path.join(temporary_directory, f'{field}.npy'), arr=getattr(world, field))
+    np.save(file=os.path.join(temporary_directory, 'infected_positions.npy'), arr=world.infected_index.to_array())
+    metadata = {
+        'shape': list(world.shape),
+        'iteration_step': world.iteration_step,
+        'immune_fraction': world.immune_fraction,
+        'initial_infected': world.initial_infected,
+        'batched': world.batched,
+        'counters': {
+            'entity_types': world.counters.entity_types.tolist(),
+            'statuses': {field: counter.tolist() for field, counter in world.counters.statuses.items()},
+        },
+        'random_stream': world.random_stream.get_state(),
+    }
+    with open(file=os.path.join(temporary_directory, METADATA_FILE_NAME), mode='w', encoding='utf-8') as file:
+        json.dump(obj=metadata, fp=file)
+        file.close()
+    shutil.rmtree(path=directory, ignore_errors=True)
+    os.replace(src=temporary_directory, dst=directory)
+    del temporary_directory, metadata
+
+
+def load_checkpoint(directory: str, world_class: type, data_file_path: str | None = None, mmap_mode: str | None = 'c') -> Any:
+    """Load an array-backed world of a class from a checkpoint directory.
+
+    Parameters
+    ----------
+    directory : str
+        The checkpoint directory.
+    world_class : type
+        The class of the loaded world, an `ArrayWorld` (sub)class.
+    data_file_path : str | None
+        The data file where the statistics of the loaded world are saved.
+    mmap_mode : str | None
+        How the tile arrays are memory-mapped (see `np.load`), None reads them in memory.
+    """
+    with open(file=os.path.join(directory, METADATA_FILE_NAME), mode='r', encoding='utf-8') as file:
+        metadata = json.load(fp=file)
+        file.close()
+    # pylint: disable=E1120
+    world = world_class.__new__(world_class)
+    world.shape = tuple(metadata['shape'])
+    world.iteration_step = metadata['iteration_step']
+    world.immune_fraction = metadata['immune_fraction']
+    world.initial_infected = metadata['initial_infected']
+    world.batched = metadata['batched']
+    world.check_counters = False
+    for field in world.tile_fields:
+        setattr(world, field, np.load(file=os.path.join(directory, f'{field}.npy'), mmap_mode=mmap_mode))
+
+    world.counters = world.create_counters()
+    world.counters.entity_types[:] = metadata['counters']['entity_types']
+    for field, counter in metadata['counters']['statuses'].items():
+        world.counters.statuses[field][:] = counter
+    world.infected_index = InfectedIndex()
+    infected_positions = np.load(file=os.path.join(directory, 'infected_positions.npy'))
+    world.infected_index.update(flat_positions=infected_positions, is_infected=np.ones(shape=infected_positions.size, dtype=np.bool_))
+    world.random_stream = RandomStream()
+    world.random_stream.set_state(state=metadata['random_stream'])
+
+    world.data_file_path = data_file_path
+    world.create_data_file()
+    del metadata, infected_positions
+    return world
+
+
+def prune_checkpoints(directory: str, retention: int) -> None:
+    """Delete every periodic checkpoint of a directory but the most recent ones."""
+    checkpoint_names = sorted(name for name in os.listdir(path=directory) if name.startswith(CHECKPOINT_PREFIX) and not name.endswith('.partial'))
+    for name in checkpoint_names[:max(0, len(checkpoint_names) - retention)]:
+        shutil.rmtree(path=os.path.join(directory, name))
+    del checkpoint_names
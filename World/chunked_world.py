@@ -0,0 +1,253 @@
+"""Module responsible for a world whose tiles are only allocated, in
+fixed-size blocks, once an infection reaches them."""
+from functools import reduce
+import numpy as np
+
+
+from Entity.entity_type import EMPTY_TILE, ENTITY_TYPE_CODES, EntityType
+from World.array_world import ArrayWorld, STATUS_VALUES
+from World.infected_index import InfectedIndex
+from World.population_counters import PopulationCounters
+from World.renderer import get_downsample_stride
+
+
+# The most tiles the immune entities can be drawn from, without replacement, at once (see `np.random.Generator.multivariate_hypergeometric`).
+MAX_HYPERGEOMETRIC_POPULATION: int = 1_000_000_000
+
+# The most tiles a whole grid of entity type codes can hold (one byte each), bigger worlds are only drawn downsampled.
+MAX_ENTITY_TYPE_GRID_TILES: int = 100_000_000
+
+
+class ChunkedWorld(ArrayWorld):
+    """Represents a batched array-backed world split in square blocks of tiles, allocated lazily.
+
+    Until a tile of a block is read or written (which only happens around
+    infected entities), the block is implicit: every one of its entities is
+    healthy, and an amount of them, drawn when the world is created so the
+    whole world keeps the requested immune fraction, are immune. Once
+    allocated, those immune entities are placed at random in the block.
+
+    Every tile is reached through `gather` and `scatter`, so circular
+    neighbors and moves work across blocks, and the memory and time of an
+    iteration follow the outbreak instead of the world area.
+    """
+
+    # pylint: disable=R0913
+    def __init__(self, shape: int, immune_fraction: float = 0.05, initial_infected: int = 1, seed: int | None = None, data_file_path: str | None = 'world_data.csv', block_size: int = 256, check_counters: bool = False) -> None:
+        """Initializes a world of lazily allocated blocks.
+
+        Parameters
+        ----------
+        shape : int
+            The amount of rows and columns of this world.
+        immune_fraction : float
+            The fraction of the (not initially infected) population that is immune.
+        initial_infected : int
+            The amount of initially infected entities.
+        seed : int | None
+            The seed of every random number drawn by this world and its entities.
+        data_file_path : str | None
+            The path of the data file where every iteration state is saved, a
+            .npy file is written in binary, None writes no file.
+        block_size : int
+            The amount of rows and columns of every block.
+        check_counters : bool
+            If the population counters should be checked against a full scan
+            of the allocated blocks every time the state is saved (debug mode).
+        """
+        self.block_size: int = block_size
+        super().__init__(shape=shape, immune_fraction=immune_fraction, initial_infected=initial_infected, seed=seed, data_file_path=data_file_path, batched=True, check_counters=check_counters)
+
+    def create_tiles(self) -> None:
+        """Creates an empty block table for this world, every block being implicit."""
+        rows, cols = self.shape
+        self.block_shape: tuple[int, int] = (-(-rows // self.block_size), -(-cols // self.block_size))
+        # The storage slot of every block, -1 while it's implicit.
+        self.block_slots: np.ndarray = np.full(shape=self.block_shape[0] * self.block_shape[1], fill_value=-1, dtype=np.int64)
+        # The amount of tiles of every block inside the world (blocks at the last row or column may be cut).
+        block_heights = np.minimum(self.block_size, rows - np.arange(self.block_shape[0]) * self.block_size)
+        block_widths = np.minimum(self.block_size, cols - np.arange(self.block_shape[1]) * self.block_size)
+        self.block_tile_amounts: np.ndarray = np.outer(block_heights, block_widths).ravel()
+        self.block_immune_amounts: np.ndarray = np.zeros(shape=self.block_slots.size, dtype=np.int64)
+        # Every tile field of every allocated block, one row per storage slot.
+        self.block_fields: dict[str, np.ndarray] = {field: np.zeros(shape=(16, self.block_size * self.block_size), dtype=dtype) for field, dtype in self.tile_fields.items()}
+        self.block_amount: int = 0
+        self.block_seed: int = int(self.random_stream.generator.integers(low=0, high=np.iinfo(np.int64).max))
+        self.counters: PopulationCounters = self.create_counters()
+        self.infected_index: InfectedIndex = InfectedIndex()
+        del block_heights, block_widths
+
+    def locate_tiles(self, flat_positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Get the block and the offset in that block of every flat position."""
+        position_x, position_y = np.divmod(np.asarray(flat_positions, dtype=np.int64), self.shape[1])
+        blocks = (position_x // self.block_size) * self.block_shape[1] + position_y // self.block_size
+        offsets = (position_x % self.block_size) * self.block_size + position_y % self.block_size
+        return blocks, offsets
+
+    def allocate_blocks(self, blocks: np.ndarray, excluded_flat_positions: np.ndarray | None = None) -> np.ndarray:
+        """Allocate every implicit block and get the storage slot of every block.
+
+        An allocated block is filled with healthy entities, its amount of
+        immune ones being placed at random, never at an excluded position.
+        """
+        for block in np.unique(blocks[self.block_slots[blocks] < 0]).tolist():
+            if self.block_amount == len(self.block_fields['entity_types']):
+                self.block_fields = {field: np.concatenate((storage, np.zeros_like(storage))) for field, storage in self.block_fields.items()}
+            slot = self.block_amount
+            self.block_amount += 1
+            self.block_slots[block] = slot
+
+            block_x, block_y = divmod(block, self.block_shape[1])
+            height = min(self.block_size, self.shape[0] - block_x * self.block_size)
+            width = min(self.block_size, self.shape[1] - block_y * self.block_size)
+            offsets = (np.arange(height)[:, np.newaxis] * self.block_size + np.arange(width)).ravel()
+            self.block_fields['alive'][slot] = True
+            self.block_fields['entity_types'][slot, offsets] = ENTITY_TYPE_CODES[EntityType.HEALTHY]
+            if excluded_flat_positions is not None:
+                excluded_blocks, excluded_offsets = self.locate_tiles(flat_positions=excluded_flat_positions)
+                offsets = np.setdiff1d(offsets, excluded_offsets[excluded_blocks == block])
+                del excluded_blocks, excluded_offsets
+            # Every block draws its immune entities from its own stream, so they don't depend on the allocation order.
+            immune_offsets = np.random.default_rng(seed=(self.block_seed, block)).choice(a=offsets, size=int(self.block_immune_amounts[block]), replace=False)
+            self.block_fields['entity_types'][slot, immune_offsets] = ENTITY_TYPE_CODES[EntityType.IMMUNE]
+            self.block_fields['immune'][slot, immune_offsets] = True
+            del offsets, immune_offsets
+        return self.block_slots[blocks]
+
+    def gather(self, field: str, flat_positions: np.ndarray) -> np.ndarray:
+        """Read a field at every specified flat position, allocating the blocks they're in."""
+        blocks, offsets = self.locate_tiles(flat_positions=flat_positions)
+        # Allocating may grow the storage, so it's done before reading it.
+        slots = self.allocate_blocks(blocks=blocks)
+        return self.block_fields[field][slots, offsets]
+
+    def scatter(self, field: str, flat_positions: np.ndarray, values: np.ndarray) -> None:
+        """Write a field at every specified flat position, allocating the blocks they're in."""
+        blocks, offsets = self.locate_tiles(flat_positions=flat_positions)
+        slots = self.allocate_blocks(blocks=blocks)
+        self.block_fields[field][slots, offsets] = values
+        if self.event_log is not None:
+            self.event_log.touch(flat_positions=flat_positions)
+
+    def get_allocated_flat_positions(self) -> tuple[np.ndarray, np.ndarray]:
+        """Get the flat position of every tile of every allocated block (inside the world), and its storage index."""
+        allocated_blocks = np.flatnonzero(self.block_slots >= 0)
+        block_x, block_y = np.divmod(allocated_blocks, self.block_shape[1])
+        tile_x, tile_y = np.divmod(np.arange(self.block_size * self.block_size), self.block_size)
+        position_x = (block_x * self.block_size)[:, np.newaxis] + tile_x
+        position_y = (block_y * self.block_size)[:, np.newaxis] + tile_y
+        is_inside = (position_x < self.shape[0]) & (position_y < self.shape[1])
+        storage_indexes = (self.block_slots[allocated_blocks][:, np.newaxis] * self.block_size * self.block_size + np.arange(self.block_size * self.block_size))[is_inside]
+        flat_positions = (position_x * self.shape[1] + position_y)[is_inside]
+        del allocated_blocks, block_x, block_y, tile_x, tile_y, position_x, position_y, is_inside
+        return flat_positions, storage_indexes
+
+    @property
+    def allocated_tile_amount(self) -> int:
+        """The amount of tiles held in memory."""
+        return self.block_amount * self.block_size * self.block_size
+
+    def choose_initial_positions(self) -> tuple[np.ndarray, np.ndarray]:
+        """Randomly choose the flat positions of the initially infected entities and the amount of immune ones of every block.
+
+        No immune position is returned, immune entities are only placed once their block is allocated.
+        """
+        tile_amount = int(reduce(np.multiply, self.shape))
+        if not 0 <= self.initial_infected <= tile_amount:
+            raise ValueError(f'The amount of initially infected entities must be between 0 and {tile_amount}.')
+        immune_amount = int(np.round((tile_amount - self.initial_infected) * self.immune_fraction))
+        infected_positions = self.random_stream.generator.choice(a=tile_amount, size=self.initial_infected, replace=False)
+        available_tile_amounts = self.block_tile_amounts - np.bincount(self.locate_tiles(flat_positions=infected_positions)[0], minlength=self.block_slots.size)
+        self.block_immune_amounts = self.distribute_entities(tile_amounts=available_tile_amounts, amount=immune_amount)
+
+        # Every entity is counted as soon as the world exists, allocated or not.
+        self.counters.entity_types[ENTITY_TYPE_CODES[EntityType.HEALTHY]] = tile_amount - immune_amount
+        self.counters.entity_types[ENTITY_TYPE_CODES[EntityType.IMMUNE]] = immune_amount
+        self.allocate_blocks(blocks=self.locate_tiles(flat_positions=infected_positions)[0], excluded_flat_positions=infected_positions)
+        del tile_amount, immune_amount, available_tile_amounts
+        return infected_positions, np.empty(shape=0, dtype=np.int64)
+
+    def distribute_entities(self, tile_amounts: np.ndarray, amount: int) -> np.ndarray:
+        """Randomly spread an amount of entities over blocks with some amount of free tiles, as if their tiles were drawn at once."""
+        generator = self.random_stream.generator
+        if tile_amounts.sum() < MAX_HYPERGEOMETRIC_POPULATION:
+            return generator.multivariate_hypergeometric(colors=tile_amounts, nsample=amount)
+        # Too many tiles to draw without replacement, every entity falls in a block with a chance of its free tiles instead.
+        amounts = np.zeros_like(tile_amounts)
+        while amount:
+            amounts += generator.multinomial(n=amount, pvals=(tile_amounts - amounts) / (tile_amounts - amounts).sum())
+            amount = int(np.maximum(amounts - tile_amounts, 0).sum())
+            amounts = np.minimum(amounts, tile_amounts)
+        return amounts
+
+    def add_healthy_entities(self) -> None:
+        """Nothing to do, every other entity is already healthy (or immune) in its block."""
+
+    def scan_counters(self) -> PopulationCounters:
+        """Count every tile of the allocated blocks, and the entities of the implicit ones, into new population counters."""
+        flat_positions, _ = self.get_allocated_flat_positions()
+        counters = self.create_counters()
+        counters.add(
+            entity_types=self.gather(field='entity_types', flat_positions=flat_positions),
+            statuses={field: self.gather(field=field, flat_positions=flat_positions) for field in STATUS_VALUES},
+            is_counted=self.gather(field='infected', flat_positions=flat_positions) & self.gather(field='alive', flat_positions=flat_positions),
+        )
+        is_implicit = self.block_slots < 0
+        implicit_immune_amount = int(self.block_immune_amounts[is_implicit].sum())
+        counters.entity_types[ENTITY_TYPE_CODES[EntityType.HEALTHY]] += int(self.block_tile_amounts[is_implicit].sum()) - implicit_immune_amount
+        counters.entity_types[ENTITY_TYPE_CODES[EntityType.IMMUNE]] += implicit_immune_amount
+        del flat_positions, is_implicit
+        return counters
+
+    def verify_counters(self) -> None:
+        """Check the population counters and the infected index against a full scan of the allocated blocks."""
+        if self.counters != self.scan_counters():
+            raise RuntimeError(f'Population counters diverged from the world state at iteration {self.iteration_step}.')
+        if not np.array_equal(self.infected_index.to_array(), self.find_flat_positions(entity_type_code=ENTITY_TYPE_CODES[EntityType.INFECTED])):
+            raise RuntimeError(f'Infected index diverged from the world state at iteration {self.iteration_step}.')
+
+    def find_flat_positions(self, entity_type_code: int) -> np.ndarray:
+        """Get the sorted flat position of every allocated tile of an entity type code."""
+        flat_positions, storage_indexes = self.get_allocated_flat_positions()
+        matching_positions = np.sort(flat_positions[self.block_fields['entity_types'].ravel()[storage_indexes] == entity_type_code])
+        del flat_positions, storage_indexes
+        return matching_positions
+
+    def get_matching_entity_type_positions(self, target_entity_type: object) -> tuple[tuple[int, int], ...]:
+        """Get the position of every matching entity type in this world, healthy and immune entities can't be listed."""
+        if target_entity_type in (EntityType.HEALTHY, EntityType.IMMUNE):
+            raise ValueError(f'The {target_entity_type.name} entities of a ChunkedWorld cannot be listed, they fill every implicit block (count them instead).')
+        return self.to_positions(flat_positions=self.find_flat_positions(entity_type_code=ENTITY_TYPE_CODES[target_entity_type]))
+
+    def get_entity_type_codes(self) -> np.ndarray:
+        """Get a grid with the entity type code of every tile in this world, implicit blocks being drawn healthy."""
+        if int(reduce(np.multiply, self.shape)) > MAX_ENTITY_TYPE_GRID_TILES:
+            raise ValueError(f'A grid of every tile of a {self.shape[0]}x{self.shape[1]} ChunkedWorld would not fit in memory, get a downsampled one instead.')
+        return self.get_downsampled_entity_type_codes(max_size=max(self.shape))
+
+    def get_downsampled_entity_type_codes(self, max_size: int) -> np.ndarray:
+        """Get a grid with the entity type code of one tile every few tiles, read from the allocated blocks only.
+
+        Implicit blocks are drawn healthy, so the grid memory follows its
+        size and the outbreak, never the world area.
+        """
+        stride = get_downsample_stride(shape=self.shape, max_size=max_size)
+        entity_type_codes = np.full(shape=(-(-self.shape[0] // stride), -(-self.shape[1] // stride)), fill_value=ENTITY_TYPE_CODES[EntityType.HEALTHY], dtype=np.uint8)
+        flat_positions, storage_indexes = self.get_allocated_flat_positions()
+        position_x, position_y = np.divmod(flat_positions, self.shape[1])
+        is_drawn = (position_x % stride == 0) & (position_y % stride == 0)
+        entity_type_codes[position_x[is_drawn] // stride, position_y[is_drawn] // stride] = self.block_fields['entity_types'].ravel()[storage_indexes[is_drawn]]
+        del flat_positions, storage_indexes, position_x, position_y, is_drawn
+        return entity_type_codes
+
+    def is_tile_empty(self, position: tuple[int, int]) -> bool:
+        """Check if a tile at position is an empty tile."""
+        return self.gather(field='entity_types', flat_positions=self.to_flat_positions(position)) == EMPTY_TILE
+
+    def save_checkpoint(self, directory: str) -> None:
+        """Not supported, a checkpoint holds every tile of the world."""
+        raise ValueError('A ChunkedWorld cannot be checkpointed, its tiles are only allocated around the outbreak.')
+
+    def record_events(self, directory: str, keyframe_every: int = 100) -> None:
+        """Not supported, the keyframes of a log are checkpoints."""
+        raise ValueError('The changes of a ChunkedWorld cannot be logged, its keyframes would hold every tile of the world.')
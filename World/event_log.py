@@ -0,0 +1,162 @@
+"""Module responsible for logging the tiles changed by every world
+iteration and rebuilding the world at any logged iteration from them."""
+import json
+import os
+from typing import Any
+import numpy as np
+
+
+from World.checkpoint import load_checkpoint, save_checkpoint
+
+
+# The whole state of a changed tile, as written in the log.
+DELTA_DTYPE: np.dtype = np.dtype([
+    ('position', '<u8'),
+    ('entity_types', 'u1'),
+    ('life_spans', '<u2'),
+    ('symptom_statuses', 'u1'),
+    ('mortality_statuses', 'u1'),
+    ('survival_statuses', 'u1'),
+    ('flags', 'u1'),
+])
+
+# The bit of every boolean field in the flags of a delta.
+DELTA_FLAGS: dict[str, int] = {'alive': 1, 'infected': 2, 'immune': 4}
+
+# The prefix of every keyframe directory, followed by its iteration.
+KEYFRAME_PREFIX: str = 'keyframe_'
+
+
+class EventLog:
+    """Represents the log of every tile changed by the iterations of an array-backed world.
+
+    After every iteration, the final state of every tile written during it
+    (infections, swaps, heals and deaths) is appended to 'deltas.bin', and
+    the amount of deltas so far to 'iterations.bin'. A full checkpoint
+    (keyframe) is saved every some iterations, so the log grows with the
+    outbreak activity and not with the world area.
+
+    Keyframes trade storage for replay time: each holds every tile of the
+    world, and rebuilding an iteration replays every delta since the
+    nearest previous one. Saving only the initial keyframe keeps the log
+    smallest, but every rebuild replays the whole run up to its iteration.
+    """
+
+    def __init__(self, directory: str, world: Any, keyframe_every: int = 100) -> None:
+        """Initializes the log of a world, starting with a keyframe of its current state.
+
+        Parameters
+        ----------
+        directory : str
+            The directory of the log files and keyframes.
+        world : ArrayWorld
+            The logged world.
+        keyframe_every : int
+            Every how many iterations a keyframe is saved, 0 only saves the
+            initial one.
+        """
+        if keyframe_every < 0:
+            raise ValueError(f'Keyframes can\'t be saved every {keyframe_every} iterations, use 0 to only save the initial one.')
+        self.directory: str = directory
+        self.keyframe_every: int = keyframe_every
+        self.touched_positions: list[np.ndarray] = []
+        os.makedirs(name=directory, exist_ok=True)
+        with open(file=os.path.join(directory, 'log.json'), mode='w', encoding='utf-8') as file:
+            json.dump(obj={'first_iteration': world.iteration_step, 'keyframe_every': keyframe_every}, fp=file)
+            file.close()
+        self.deltas_file = open(file=os.path.join(directory, 'deltas.bin'), mode='wb')
+        self.iterations_file = open(file=os.path.join(directory, 'iterations.bin'), mode='wb')
+        self.delta_amount: int = 0
+        save_checkpoint(world=world, directory=os.path.join(directory, f'{KEYFRAME_PREFIX}{world.iteration_step:08d}'))
+
+    def touch(self, flat_positions: np.ndarray) -> None:
+        """Mark the tiles at every flat position as changed in this iteration."""
+        self.touched_positions.append(np.array(object=np.ravel(flat_positions), dtype=np.int64))
+
+    def end_iteration(self, world: Any) -> None:
+        """Append the final state of every tile changed in the iteration that just ended."""
+        flat_positions = np.unique(np.concatenate(self.touched_positions)) if self.touched_positions else np.empty(shape=0, dtype=np.int64)
+        self.touched_positions.clear()
+        deltas = np.empty(shape=flat_positions.size, dtype=DELTA_DTYPE)
+        deltas['position'] = flat_positions
+        deltas['flags'] = 0
+        for field in DELTA_DTYPE.names:
+            if field in world.tile_fields:
+                deltas[field] = world.gather(field=field, flat_positions=flat_positions)
+        for field, flag in DELTA_FLAGS.items():
+            deltas['flags'] |= world.gather(field=field, flat_positions=flat_positions).astype(np.uint8) * flag
+        self.deltas_file.write(deltas.tobytes())
+        self.delta_amount += deltas.size
+        self.iterations_file.write(np.int64(self.delta_amount).tobytes())
+        if self.keyframe_every and world.iteration_step % self.keyframe_every == 0:
+            self.flush()
+            save_checkpoint(world=world, directory=os.path.join(self.directory, f'{KEYFRAME_PREFIX}{world.iteration_step:08d}'))
+        del flat_positions, deltas
+
+    def flush(self) -> None:
+        """Write every buffered delta."""
+        self.deltas_file.flush()
+        self.iterations_file.flush()
+
+    def close(self) -> None:
+        """Write every buffered delta and close the log files."""
+        self.deltas_file.close()
+        self.iterations_file.close()
+
+
+class EventLogReader:
+    """Represents a logged run, able to rebuild the world at any of its iterations without simulating it."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory: str = directory
+        with open(file=os.path.join(directory, 'log.json'), mode='r', encoding='utf-8') as file:
+            log = json.load(fp=file)
+            file.close()
+        self.first_iteration: int = log['first_iteration']
+        # The amount of deltas written once every iteration was reached, starting with the first one.
+        self.delta_amounts: np.ndarray = np.concatenate(([0], np.fromfile(file=os.path.join(directory, 'iterations.bin'), dtype=np.int64)))
+        self.deltas: np.ndarray = np.memmap(filename=os.path.join(directory, 'deltas.bin'), dtype=DELTA_DTYPE, mode='r') if self.delta_amounts[-1] else np.empty(shape=0, dtype=DELTA_DTYPE)
+        self.keyframes: list[int] = sorted(int(name[len(KEYFRAME_PREFIX):]) for name in os.listdir(path=directory) if name.startswith(KEYFRAME_PREFIX) and not name.endswith('.partial'))
+        del log
+
+    @property
+    def last_iteration(self) -> int:
+        """The last iteration that can be rebuilt."""
+        return self.first_iteration + len(self.delta_amounts) - 1
+
+    def get_deltas(self, iteration: int) -> np.ndarray:
+        """Get every delta of the iteration ending at an iteration (the tiles it changed)."""
+        index = iteration - self.first_iteration
+        return self.deltas[self.delta_amounts[index - 1]:self.delta_amounts[index]]
+
+    def load_world(self, iteration: int, world_class: type | None = None) -> Any:
+        """Rebuild the world at an iteration, from its nearest previous keyframe and the deltas after it.
+
+        The rebuilt world has no data file and keeps the random state of the
+        keyframe, it's meant to be inspected, not resumed.
+        """
+        if not self.first_iteration <= iteration <= self.last_iteration:
+            raise ValueError(f'Only iterations between {self.first_iteration} and {self.last_iteration} were logged.')
+        if world_class is None:
+            # pylint: disable=C0415
+            from World.array_world import ArrayWorld
+            world_class = ArrayWorld
+        keyframe = max(keyframe for keyframe in self.keyframes if keyframe <= iteration)
+        world = load_checkpoint(directory=os.path.join(self.directory, f'{KEYFRAME_PREFIX}{keyframe:08d}'), world_class=world_class)
+
+        # Only the last delta of every tile changed since the keyframe matters.
+        deltas = self.deltas[self.delta_amounts[keyframe - self.first_iteration]:self.delta_amounts[iteration - self.first_iteration]][::-1]
+        _, last_indexes = np.unique(deltas['position'], return_index=True)
+        deltas = deltas[last_indexes]
+        flat_positions = deltas['position'].astype(np.int64)
+        world.count_tiles(flat_positions=flat_positions, sign=-1)
+        for field in DELTA_DTYPE.names:
+            if field in world.tile_fields:
+                world.scatter(field=field, flat_positions=flat_positions, values=deltas[field])
+        for field, flag in DELTA_FLAGS.items():
+            world.scatter(field=field, flat_positions=flat_positions, values=(deltas['flags'] & flag) != 0)
+        world.count_tiles(flat_positions=flat_positions)
+        world.index_tiles(flat_positions=flat_positions)
+        world.iteration_step = iteration
+        del deltas, last_indexes, flat_positions
+        return world
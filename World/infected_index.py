@@ -0,0 +1,45 @@
+"""Module responsible for indexing the position of every infected
+entity of a world, so they can be found without scanning every tile."""
+import numpy as np
+
+
+class InfectedIndex:
+    """Represents the sorted flat positions holding an infected entity.
+
+    Updates are only buffered, so indexing a couple of tiles at a time (as
+    a per-entity iteration does) stays cheap, and merged into the sorted
+    positions at once whenever they're read.
+    """
+
+    def __init__(self) -> None:
+        self.positions: np.ndarray = np.zeros(shape=0, dtype=np.int64)
+        self.pending_positions: list[np.ndarray] = []
+        self.pending_is_infected: list[np.ndarray] = []
+
+    def __len__(self) -> int:
+        """Get the amount of indexed infected entities."""
+        self.merge()
+        return self.positions.size
+
+    def update(self, flat_positions: np.ndarray, is_infected: np.ndarray) -> None:
+        """Index every infected flat position and drop every other one."""
+        self.pending_positions.append(np.array(object=np.ravel(flat_positions), dtype=np.int64))
+        self.pending_is_infected.append(np.array(object=np.ravel(is_infected), dtype=np.bool_))
+
+    def merge(self) -> None:
+        """Merge every buffered update into the sorted positions."""
+        if not self.pending_positions:
+            return
+        flat_positions, is_infected = np.concatenate(self.pending_positions), np.concatenate(self.pending_is_infected)
+        self.pending_positions.clear()
+        self.pending_is_infected.clear()
+        # The last update of every flat position is the one that holds.
+        last_updates = flat_positions.size - 1 - np.unique(flat_positions[::-1], return_index=True)[1]
+        flat_positions, is_infected = flat_positions[last_updates], is_infected[last_updates]
+        self.positions = np.union1d(np.setdiff1d(self.positions, flat_positions[~is_infected], assume_unique=True), flat_positions[is_infected])
+        del last_updates, flat_positions, is_infected
+
+    def to_array(self) -> np.ndarray:
+        """Get every indexed flat position, sorted in the same order as a scan of the world."""
+        self.merge()
+        return self.positions.copy()
@@ -0,0 +1,55 @@
+"""Module responsible for keeping the population counts of a world
+up to date as its entities change, instead of scanning every tile."""
+import numpy as np
+
+
+class PopulationCounters:
+    """Represents the amount of entities of every entity type and status code."""
+
+    def __init__(self, entity_type_amount: int, status_amounts: dict[str, int]) -> None:
+        """Initializes every counter at zero.
+
+        Parameters
+        ----------
+        entity_type_amount : int
+            The amount of entity type codes, including the empty tile code.
+        status_amounts : dict[str, int]
+            The amount of status codes of every status field.
+        """
+        self.entity_types: np.ndarray = np.zeros(shape=entity_type_amount, dtype=np.int64)
+        self.statuses: dict[str, np.ndarray] = {field: np.zeros(shape=amount, dtype=np.int64) for field, amount in status_amounts.items()}
+
+    def add(self, entity_types: np.ndarray, statuses: dict[str, np.ndarray], is_counted: np.ndarray, sign: int = 1) -> None:
+        """Add (or remove, with a negative sign) some entities from every counter.
+
+        Parameters
+        ----------
+        entity_types : np.ndarray
+            The entity type code of every entity.
+        statuses : dict[str, np.ndarray]
+            The status codes of every entity, for every status field.
+        is_counted : np.ndarray
+            If the statuses of every entity are counted, only living infected ones are.
+        sign : int
+            1 to add the entities, -1 to remove them.
+        """
+        self.entity_types += sign * np.bincount(np.ravel(entity_types), minlength=self.entity_types.size)
+        for field, counter in self.statuses.items():
+            counter += sign * np.bincount(np.ravel(statuses[field])[np.ravel(is_counted)], minlength=counter.size)
+
+    def move(self, old_entity_type: int, new_entity_type: int, amount: int) -> None:
+        """Move an amount of entities from one entity type code to another."""
+        self.entity_types[old_entity_type] -= amount
+        self.entity_types[new_entity_type] += amount
+
+    def merge(self, other: 'PopulationCounters') -> None:
+        """Add every amount of other counters (usually a delta) into these counters."""
+        self.entity_types += other.entity_types
+        for field, counter in self.statuses.items():
+            counter += other.statuses[field]
+
+    def __eq__(self, other: object) -> bool:
+        """Check if two counters hold the same amounts."""
+        if not isinstance(other, PopulationCounters):
+            return NotImplemented
+        return np.array_equal(self.entity_types, other.entity_types) and all(np.array_equal(counter, other.statuses[field]) for field, counter in self.statuses.items())
@@ -0,0 +1,186 @@
+"""Module responsible for timing every phase of the world iterations and
+handing the per-iteration reports to observers, such as a file or a
+Prometheus-style metrics endpoint."""
+import json
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+
+# Every phase of an iteration, as reported:
+# - save_state: collecting and writing the statistics (and frames);
+# - scan: finding the infected entities;
+# - sampling: drawing the random numbers of the whole iteration (batched worlds);
+# - transition: ticking life spans, healing and killing;
+# - infection: infecting neighbors, including their status draws;
+# - movement: moving the infected entities.
+PROFILED_PHASES: tuple[str, ...] = ('save_state', 'scan', 'sampling', 'transition', 'infection', 'movement')
+
+
+class IterationProfiler:
+    """Represents the per-phase wall time, touched tiles and (optionally) allocations of every world iteration.
+
+    A world only calls its profiler when one is set (see `World.set_profiler`),
+    so an unprofiled world pays a single attribute check per phase. Once an
+    iteration ends, its report is handed to every observer:
+
+        {'iteration': 3, 'phases': {'scan': {'seconds': ..., 'cells': ..., 'allocated_bytes': ..., 'peak_bytes': ...}, ...}}
+    """
+
+    def __init__(self, observers: list[Callable[[dict], None]] | None = None, trace_allocations: bool = False) -> None:
+        """Initializes a profiler.
+
+        Parameters
+        ----------
+        observers : list[Callable[[dict], None]] | None
+            Every callable the report of each iteration is handed to.
+        trace_allocations : bool
+            If the memory allocated by every phase should be traced (with
+            `tracemalloc`, which slows everything down).
+        """
+        self.observers: list[Callable[[dict], None]] = list(observers or [])
+        self.trace_allocations: bool = trace_allocations
+        # Only the tracing started by this profiler is stopped with it.
+        self.started_tracing: bool = trace_allocations and not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+        self.phases: dict[str, dict[str, int | float]] = {}
+        self.phase_starts: dict[str, tuple[float, int]] = {}
+
+    def add_observer(self, observer: Callable[[dict], None]) -> None:
+        """Hand the report of every following iteration to an observer."""
+        self.observers.append(observer)
+
+    def start_phase(self, phase: str) -> None:
+        """Start timing a phase of this iteration."""
+        allocated_bytes = 0
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            allocated_bytes = tracemalloc.get_traced_memory()[0]
+        self.phase_starts[phase] = (time.perf_counter(), allocated_bytes)
+
+    def end_phase(self, phase: str, cells: int = 0) -> None:
+        """Stop timing a phase of this iteration, which touched some tiles, adding it to this iteration report."""
+        end = time.perf_counter()
+        start, start_allocated_bytes = self.phase_starts.pop(phase)
+        report = self.phases.setdefault(phase, {'seconds': 0.0, 'cells': 0, 'allocated_bytes': 0, 'peak_bytes': 0})
+        report['seconds'] += end - start
+        report['cells'] += int(cells)
+        if self.trace_allocations:
+            allocated_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            report['allocated_bytes'] += allocated_bytes - start_allocated_bytes
+            report['peak_bytes'] = max(report['peak_bytes'], peak_bytes - start_allocated_bytes)
+
+    def end_iteration(self, iteration: int) -> None:
+        """Hand the report of the iteration that just ended to every observer and start a new one."""
+        report = {'iteration': iteration, 'phases': self.phases}
+        self.phases = {}
+        for observer in self.observers:
+            observer(report)
+
+    def close(self) -> None:
+        """Stop tracing allocations, if this profiler started it, and close every observer that can be closed."""
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+        for observer in self.observers:
+            if hasattr(observer, 'close'):
+                observer.close()
+
+
+class FileExporter:
+    """Represents an observer writing every iteration report as a JSON line of a file."""
+
+    def __init__(self, path: str) -> None:
+        self.file = open(file=path, mode='w', encoding='utf-8')
+
+    def __call__(self, report: dict) -> None:
+        self.file.write(json.dumps(obj=report) + '\n')
+
+    def close(self) -> None:
+        """Write every pending report and close the file."""
+        self.file.close()
+
+
+class PrometheusExporter:
+    """Represents an observer serving the totals of every phase as Prometheus text metrics, from a local HTTP thread."""
+
+    def __init__(self, port: int = 9100, host: str = '127.0.0.1') -> None:
+        """Initializes the metrics and starts serving them at http://host:port/metrics.
+
+        Parameters
+        ----------
+        port : int
+            The port of the metrics endpoint, 0 picks a free one (see `self.port`).
+        host : str
+            The address the endpoint listens on, only the local machine by default.
+        """
+        self.lock: threading.Lock = threading.Lock()
+        self.iteration: int = 0
+        self.totals: dict[str, dict[str, int | float]] = {}
+        self.last_phases: dict[str, dict[str, int | float]] = {}
+        exporter = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            """Handles the requests to the metrics endpoint."""
+
+            # pylint: disable=C0103
+            def do_GET(self) -> None:
+                """Answer the current metrics."""
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(code=404)
+                    return
+                body = exporter.format_metrics().encode('utf-8')
+                self.send_response(code=200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            # pylint: disable=W0622
+            def log_message(self, format: str, *args) -> None:
+                """Keep every request out of the standard error."""
+
+        self.server: ThreadingHTTPServer = ThreadingHTTPServer(server_address=(host, port), RequestHandlerClass=MetricsHandler)
+        self.port: int = self.server.server_address[1]
+        self.thread: threading.Thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def __call__(self, report: dict) -> None:
+        with self.lock:
+            self.iteration = report['iteration']
+            self.last_phases = report['phases']
+            for phase, phase_report in report['phases'].items():
+                totals = self.totals.setdefault(phase, {'seconds': 0.0, 'cells': 0, 'allocated_bytes': 0})
+                for name in totals:
+                    totals[name] += phase_report[name]
+
+    def format_metrics(self) -> str:
+        """Get every metric in the Prometheus text format."""
+        with self.lock:
+            lines = [
+                '# HELP infection_simulator_iteration The last profiled iteration.',
+                '# TYPE infection_simulator_iteration gauge',
+                f'infection_simulator_iteration {self.iteration}',
+            ]
+            metrics = (
+                ('phase_seconds_total', 'counter', 'Wall time spent in every phase.', self.totals, 'seconds'),
+                ('phase_cells_total', 'counter', 'Tiles touched by every phase.', self.totals, 'cells'),
+                # Net allocations shrink when a phase frees more than it allocates, so they are a gauge, not a counter.
+                ('phase_allocated_bytes', 'gauge', 'Memory allocated minus memory freed by every phase since the start, if traced.', self.totals, 'allocated_bytes'),
+                ('phase_last_seconds', 'gauge', 'Wall time spent in every phase of the last iteration.', self.last_phases, 'seconds'),
+                ('phase_last_peak_bytes', 'gauge', 'Peak memory allocated by every phase of the last iteration, if traced.', self.last_phases, 'peak_bytes'),
+            )
+            for name, metric_type, description, phases, field in metrics:
+                lines.append(f'# HELP infection_simulator_{name} {description}')
+                lines.append(f'# TYPE infection_simulator_{name} {metric_type}')
+                lines.extend(f'infection_simulator_{name}{{phase="{phase}"}} {report[field]}' for phase, report in phases.items())
+        return '\n'.join(lines) + '\n'
+
+    def close(self) -> None:
+        """Stop serving the metrics."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
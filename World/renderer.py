@@ -0,0 +1,184 @@
+"""Module responsible for drawing the world state, either live in a plot
+or off-screen into an animated GIF or video file."""
+import queue
+import shutil
+import subprocess
+import threading
+from typing import Any, BinaryIO
+import numpy as np
+
+
+from Entity.entity_type import ENTITY_TYPES
+
+
+# The color of every entity type code, the empty tile code first.
+ENTITY_TYPE_COLORS: tuple[str, ...] = ('#ffffff', *({'HEALTHY': '#90ee90', 'IMMUNE': '#ffc0cb', 'INFECTED': '#fa8072', 'DEAD': '#000000', 'HEALED': '#90ee90'}[entity_type.name] for entity_type in ENTITY_TYPES))
+
+# The same palette as RGB values, indexed by entity type code.
+ENTITY_TYPE_PALETTE: np.ndarray = np.array(object=[[int(color[index:index + 2], 16) for index in (1, 3, 5)] for color in ENTITY_TYPE_COLORS], dtype=np.uint8)
+
+
+def get_downsample_stride(shape: tuple[int, ...], max_size: int) -> int:
+    """Get every how many tiles one is kept so a grid of some shape fits in max_size x max_size."""
+    return max(1, -(-max(shape) // max_size))
+
+
+def downsample(entity_type_codes: np.ndarray, max_size: int) -> np.ndarray:
+    """Keep one tile every few tiles so a grid fits in max_size x max_size."""
+    stride = get_downsample_stride(shape=entity_type_codes.shape, max_size=max_size)
+    return entity_type_codes[::stride, ::stride]
+
+
+class LiveRenderer:
+    """Represents a live plot of the world, keeping one image updated every iteration."""
+
+    def __init__(self, interval: float = 0.001, max_size: int = 1000) -> None:
+        """Initializes a live plot.
+
+        Parameters
+        ----------
+        interval : float
+            For how long (in seconds) the plot events are processed after every draw.
+        max_size : int
+            The maximum amount of drawn rows and columns, bigger worlds are downsampled.
+        """
+        # pylint: disable=C0415
+        import matplotlib.pyplot as plt
+        from matplotlib.colors import ListedColormap
+
+        self.plt = plt
+        self.interval: float = interval
+        self.max_size: int = max_size
+        self.figure, self.axes = plt.subplots()
+        self.image = self.axes.imshow(
+            X=np.zeros(shape=(1, 1), dtype=np.uint8),
+            cmap=ListedColormap(colors=ENTITY_TYPE_COLORS),
+            vmin=0,
+            vmax=len(ENTITY_TYPE_COLORS) - 1,
+            interpolation='nearest',
+        )
+
+        # Creates a legend for every entity type, once.
+        legend_handles = [plt.Rectangle((0, 0), 1, 1, color=color) for color in ENTITY_TYPE_COLORS[1:]]
+        self.axes.legend(legend_handles, [entity_type.name for entity_type in ENTITY_TYPES], loc='upper right', bbox_to_anchor=(1.35, 1))
+
+        # Remove the X and Y-axis metrics.
+        self.axes.set_xticks(ticks=[])
+        self.axes.set_yticks(ticks=[])
+
+    def draw(self, world: Any) -> None:
+        """Draws the current world state in the plot."""
+        entity_type_codes = world.get_downsampled_entity_type_codes(max_size=self.max_size)
+        self.image.set_data(entity_type_codes)
+        self.image.set_extent((-0.5, entity_type_codes.shape[1] - 0.5, entity_type_codes.shape[0] - 0.5, -0.5))
+        self.axes.set_title(label=f'Iteration {world.iteration_step}')
+        self.plt.show(block=False)
+        self.plt.pause(interval=self.interval)
+        del entity_type_codes
+
+
+class FrameRecorder:
+    """Represents an off-screen recording of the world into an animated .gif or a video file.
+
+    Frames are converted and written by a background thread, the simulation
+    only copies the entity type grid. Every frame is written as soon as it's
+    converted, so the memory of a recording never grows with its length: a
+    .gif is encoded frame by frame with Pillow, any other file is streamed to
+    an `ffmpeg` process.
+    """
+
+    def __init__(self, path: str, every: int = 1, max_size: int = 1000, frames_per_second: int = 10) -> None:
+        """Initializes a recording and starts its writer thread.
+
+        Parameters
+        ----------
+        path : str
+            The path of the .gif or video file.
+        every : int
+            Every how many iterations a frame is recorded.
+        max_size : int
+            The maximum amount of rows and columns of a frame, bigger worlds are downsampled.
+        frames_per_second : int
+            The speed of the animation.
+        """
+        self.path: str = path
+        self.every: int = every
+        self.max_size: int = max_size
+        self.frames_per_second: int = frames_per_second
+        self.frames: queue.Queue = queue.Queue(maxsize=16)
+        self.gif_file: BinaryIO | None = None
+        self.video_process: subprocess.Popen | None = None
+        self.error: BaseException | None = None
+        self.thread: threading.Thread = threading.Thread(target=self.write_frames, daemon=True)
+        self.thread.start()
+
+    def record(self, world: Any) -> None:
+        """Record the current world state, if a frame is due at this iteration."""
+        if self.error is not None:
+            raise RuntimeError(f'Could not write frames to {self.path}.') from self.error
+        if world.iteration_step % self.every == 0:
+            self.frames.put(item=world.get_downsampled_entity_type_codes(max_size=self.max_size).copy())
+
+    def write_frames(self) -> None:
+        """Write every recorded frame until the recording is closed (writer thread)."""
+        while (entity_type_codes := self.frames.get()) is not None:
+            if self.error is None:
+                try:
+                    self.write_frame(entity_type_codes=entity_type_codes)
+                # pylint: disable=W0718
+                except Exception as error:
+                    self.error = error
+            del entity_type_codes
+            self.frames.task_done()
+        self.frames.task_done()
+
+    def write_frame(self, entity_type_codes: np.ndarray) -> None:
+        """Write one frame to the .gif frames or the video process."""
+        if self.path.endswith('.gif'):
+            # pylint: disable=C0415
+            from PIL import GifImagePlugin, Image
+            frame = Image.fromarray(entity_type_codes, mode='P')
+            frame.putpalette(ENTITY_TYPE_PALETTE.ravel().tolist())
+            if self.gif_file is None:
+                # The first frame gives the size and palette of the whole animation, looping forever.
+                self.gif_file = open(file=self.path, mode='wb')
+                self.gif_file.write(b''.join(GifImagePlugin.getheader(im=frame, info={'loop': 0})[0]))
+            self.gif_file.write(b''.join(GifImagePlugin.getdata(frame, duration=int(1000 / self.frames_per_second))))
+            return
+        frame = ENTITY_TYPE_PALETTE[entity_type_codes]
+        # Most video codecs need even dimensions.
+        frame = np.pad(frame, pad_width=((0, frame.shape[0] % 2), (0, frame.shape[1] % 2), (0, 0)), mode='edge')
+        if self.video_process is None:
+            if shutil.which('ffmpeg') is None:
+                raise RuntimeError('ffmpeg is needed to write video files, record a .gif instead.')
+            self.video_process = subprocess.Popen(
+                args=['ffmpeg', '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{frame.shape[1]}x{frame.shape[0]}', '-r', str(self.frames_per_second), '-i', '-', '-pix_fmt', 'yuv420p', self.path],
+                stdin=subprocess.PIPE,
+            )
+        self.video_process.stdin.write(frame.tobytes())
+
+    def flush(self) -> None:
+        """Wait until every recorded frame is written, keeping the recording open."""
+        self.frames.join()
+        if self.gif_file is not None:
+            self.gif_file.flush()
+        if self.video_process is not None:
+            self.video_process.stdin.flush()
+        if self.error is not None:
+            raise RuntimeError(f'Could not write frames to {self.path}.') from self.error
+
+    def close(self) -> None:
+        """Write every pending frame and finish the file."""
+        self.frames.put(item=None)
+        self.thread.join()
+        if self.gif_file is not None:
+            # The GIF trailer.
+            self.gif_file.write(b';')
+            self.gif_file.close()
+            self.gif_file = None
+        if self.video_process is not None:
+            self.video_process.stdin.close()
+            self.video_process.wait()
+            self.video_process = None
+        if self.error is not None:
+            raise RuntimeError(f'Could not write frames to {self.path}.') from self.error
@@ -0,0 +1,189 @@
+"""Module responsible for a world that samples, at infection time, when
+each entity heals or dies and only handles those transitions when due."""
+import heapq
+import itertools
+from typing import Any
+import numpy as np
+
+
+from Entity.entity import Entity
+from Entity.entity_type import ENTITY_TYPE_CODES, EntityType
+from World.array_world import ArrayWorld, TILE_FIELDS, RANDOMS_PER_INFECTED, SEVERE_SURVIVAL_THRESHOLD, get_status_code
+
+
+class ScheduledWorld(ArrayWorld):
+    """Represents a batched array-backed world whose heals and deaths are scheduled events.
+
+    When an entity gets infected, the tick it heals at (always the one after
+    `Entity.infection_duration`) and, for 'GRAVE' entities, the tick it dies
+    at (geometric, as the death draw of every tick) are drawn at once. Those
+    events wait in a priority queue, by iteration, so life spans are no
+    longer ticked on every infected entity: an iteration only handles the
+    entities whose transition is due.
+
+    Life spans of infected entities are only written when they heal or die,
+    reading a tile (or saving a checkpoint) derives them from the iteration
+    they got infected at.
+    """
+
+    # Every per-tile field, plus the id of the scheduled entity at each tile (0 if none).
+    tile_fields: dict[str, type] = {**TILE_FIELDS, 'entity_ids': np.uint32}
+
+    def __init__(self, shape: int, immune_fraction: float = 0.05, initial_infected: int = 1, seed: int | None = None, data_file_path: str | None = 'world_data.csv', check_counters: bool = False) -> None:
+        """Initializes a world with scheduled heals and deaths.
+
+        Parameters
+        ----------
+        shape : int
+            The amount of rows and columns of this world.
+        immune_fraction : float
+            The fraction of the (not initially infected) population that is immune.
+        initial_infected : int
+            The amount of initially infected entities.
+        seed : int | None
+            The seed of every random number drawn by this world and its entities.
+        data_file_path : str | None
+            The path of the data file where every iteration state is saved, a
+            .npy file is written in binary, None writes no file.
+        check_counters : bool
+            If the population counters should be checked against a full scan
+            of the world every time the state is saved (debug mode).
+        """
+        super().__init__(shape=shape, immune_fraction=immune_fraction, initial_infected=initial_infected, seed=seed, data_file_path=data_file_path, batched=True, check_counters=check_counters)
+
+    def create_tiles(self) -> None:
+        """Creates one empty array per tile field and an empty schedule for this world."""
+        super().create_tiles()
+        # Every pending event: (iteration, sequence, entity ids, if they heal, if they die).
+        self.events: list[tuple[int, int, np.ndarray, np.ndarray, np.ndarray]] = []
+        self.event_sequence: itertools.count = itertools.count()
+        # The flat position and the first ticked iteration of every entity id, id 0 is never used.
+        self.positions_by_id: np.ndarray = np.zeros(shape=1024, dtype=np.int64)
+        self.first_ticks_by_id: np.ndarray = np.zeros(shape=1024, dtype=np.int64)
+        self.next_entity_id: int = 1
+        # The ids of the entities that already healed or died, reused before any new one.
+        self.free_entity_ids: np.ndarray = np.zeros(shape=0, dtype=np.int64)
+        # The first iteration ticking the entities infected now.
+        self.first_tick: int = 0
+
+    @classmethod
+    def load_checkpoint(cls, directory: str, data_file_path: str | None = None, mmap_mode: str | None = 'c') -> ArrayWorld:
+        """Load a world from a checkpoint directory, as a batched `ArrayWorld` (the schedule is not saved)."""
+        return ArrayWorld.load_checkpoint(directory=directory, data_file_path=data_file_path, mmap_mode=mmap_mode)
+
+    def save_checkpoint(self, directory: str) -> None:
+        """Save the whole state of this world in a checkpoint directory, with the current life spans."""
+        infected_positions = self.infected_index.to_array()
+        self.scatter(field='life_spans', flat_positions=infected_positions, values=self.get_life_spans(flat_positions=infected_positions))
+        super().save_checkpoint(directory=directory)
+        del infected_positions
+
+    def record_events(self, directory: str, keyframe_every: int = 100) -> None:
+        """Not supported, life spans are not written every iteration (log a batched `ArrayWorld` instead)."""
+        raise ValueError('The changes of a ScheduledWorld cannot be logged, use a batched ArrayWorld instead.')
+
+    def read_tile_field(self, position: tuple[int, int], field: str) -> Any:
+        """Read and decode a single field of the tile at a position, deriving the life span of scheduled entities."""
+        if field == 'life_spans':
+            return int(self.get_life_spans(flat_positions=self.to_flat_positions(position)))
+        return super().read_tile_field(position=position, field=field)
+
+    def get_life_spans(self, flat_positions: np.ndarray) -> np.ndarray:
+        """Get the life span of the entities at every flat position."""
+        entity_ids = self.gather(field='entity_ids', flat_positions=flat_positions)
+        return np.where(entity_ids != 0, self.iteration_step - self.first_ticks_by_id[entity_ids], self.gather(field='life_spans', flat_positions=flat_positions))
+
+    def add_infected_entities(self, flat_positions: np.ndarray) -> None:
+        """Transform the entities at every flat position into infected entities, ticked from this iteration on."""
+        self.first_tick = self.iteration_step
+        super().add_infected_entities(flat_positions=flat_positions)
+
+    def next_batched_iteration(self) -> None:
+        """Step into the next world iteration, handling only the heals and deaths due at it."""
+        profiler = self.profiler
+        self.save_state()
+        if profiler is not None:
+            profiler.start_phase(phase='scan')
+        infected_positions = self.infected_index.to_array()
+        if profiler is not None:
+            profiler.end_phase(phase='scan', cells=infected_positions.size)
+            profiler.start_phase(phase='sampling')
+        # The death draw is replaced by the schedule, only the move and status draws are needed.
+        draws = self.random_stream.randoms(size=(RANDOMS_PER_INFECTED - 1, infected_positions.size))
+        if profiler is not None:
+            profiler.end_phase(phase='sampling', cells=infected_positions.size)
+            profiler.start_phase(phase='transition')
+        transition_amount = self.run_due_events()
+        if profiler is not None:
+            profiler.end_phase(phase='transition', cells=transition_amount)
+        self.first_tick = self.iteration_step + 1
+        self.step_infected_tiles(infected_positions=infected_positions, move_draws=draws[0], status_draws=draws[1:].reshape(3, -1))
+        del infected_positions, draws
+        self.iteration_step += 1
+        if profiler is not None:
+            profiler.end_iteration(iteration=self.iteration_step)
+
+    def infect_tiles(self, flat_positions: np.ndarray, status_draws: np.ndarray) -> None:
+        """Infect the entities at every flat position and schedule when the living ones heal or die."""
+        super().infect_tiles(flat_positions=flat_positions, status_draws=status_draws)
+        self.schedule_events(flat_positions=flat_positions[self.gather(field='alive', flat_positions=flat_positions)])
+
+    def schedule_events(self, flat_positions: np.ndarray) -> None:
+        """Draw the heal or death tick of the just infected entities at every flat position and queue them."""
+        reused_amount = min(self.free_entity_ids.size, flat_positions.size)
+        entity_ids = np.concatenate((self.free_entity_ids[self.free_entity_ids.size - reused_amount:], np.arange(self.next_entity_id, self.next_entity_id + flat_positions.size - reused_amount)))
+        self.free_entity_ids = self.free_entity_ids[:self.free_entity_ids.size - reused_amount]
+        self.next_entity_id += flat_positions.size - reused_amount
+        while self.next_entity_id > self.positions_by_id.size:
+            self.positions_by_id = np.concatenate((self.positions_by_id, np.zeros_like(self.positions_by_id)))
+            self.first_ticks_by_id = np.concatenate((self.first_ticks_by_id, np.zeros_like(self.first_ticks_by_id)))
+        self.positions_by_id[entity_ids] = flat_positions
+        self.first_ticks_by_id[entity_ids] = self.first_tick
+        self.scatter(field='entity_ids', flat_positions=flat_positions, values=entity_ids)
+
+        # Entities heal on the tick after their infection duration, severe ones die on every tick with the same probability.
+        heal_tick = Entity.infection_duration + 1
+        death_ticks = np.full(shape=flat_positions.size, fill_value=heal_tick + 1)
+        is_severe = self.gather(field='mortality_statuses', flat_positions=flat_positions) == get_status_code(field='mortality_statuses', status='GRAVE')
+        death_ticks[is_severe] = self.random_stream.generator.geometric(p=1 - SEVERE_SURVIVAL_THRESHOLD, size=int(np.count_nonzero(is_severe)))
+        event_ticks = np.minimum(death_ticks, heal_tick)
+        event_iterations = self.first_tick + event_ticks - 1
+        for iteration in np.unique(event_iterations).tolist():
+            is_due = event_iterations == iteration
+            heapq.heappush(self.events, (iteration, next(self.event_sequence), entity_ids[is_due], event_ticks[is_due] == heal_tick, death_ticks[is_due] <= heal_tick))
+            del is_due
+        del entity_ids, death_ticks, is_severe, event_ticks, event_iterations
+
+    def run_due_events(self) -> int:
+        """Heal or kill every entity whose transition is due at this iteration, as `Entity.increase_life_span`, and get their amount."""
+        due_events = []
+        while self.events and self.events[0][0] <= self.iteration_step:
+            due_events.append(heapq.heappop(self.events))
+        if not due_events:
+            return 0
+        entity_ids = np.concatenate([event[2] for event in due_events])
+        flat_positions = self.positions_by_id[entity_ids]
+        self.count_tiles(flat_positions=flat_positions, sign=-1)
+        healed_positions = flat_positions[np.concatenate([event[3] for event in due_events])]
+        self.scatter(field='infected', flat_positions=healed_positions, values=False)
+        self.scatter(field='immune', flat_positions=healed_positions, values=True)
+        self.scatter(field='entity_types', flat_positions=healed_positions, values=ENTITY_TYPE_CODES[EntityType.HEALED])
+        # Severe entities can die on the tick they heal.
+        dead_positions = flat_positions[np.concatenate([event[4] for event in due_events])]
+        self.scatter(field='alive', flat_positions=dead_positions, values=False)
+        self.scatter(field='entity_types', flat_positions=dead_positions, values=ENTITY_TYPE_CODES[EntityType.DEAD])
+        self.scatter(field='life_spans', flat_positions=flat_positions, values=self.iteration_step - self.first_ticks_by_id[entity_ids] + 1)
+        self.scatter(field='entity_ids', flat_positions=flat_positions, values=0)
+        self.free_entity_ids = np.concatenate((self.free_entity_ids, entity_ids))
+        self.count_tiles(flat_positions=flat_positions)
+        self.index_tiles(flat_positions=flat_positions)
+        del due_events, entity_ids, healed_positions, dead_positions
+        return flat_positions.size
+
+    def move_flat_tiles(self, old_positions: np.ndarray, new_positions: np.ndarray) -> None:
+        """Move the information of many tiles in this world, the new flat positions being the old ones in any order, following the scheduled entities."""
+        super().move_flat_tiles(old_positions=old_positions, new_positions=new_positions)
+        entity_ids = self.gather(field='entity_ids', flat_positions=new_positions)
+        is_scheduled = entity_ids != 0
+        self.positions_by_id[entity_ids[is_scheduled]] = new_positions[is_scheduled]
+        del entity_ids, is_scheduled
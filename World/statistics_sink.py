@@ -0,0 +1,138 @@
+"""Module responsible for storing the statistics of every world iteration,
+buffering them in memory and writing them in batches."""
+from abc import ABC, abstractmethod
+import struct
+import numpy as np
+
+
+# Every column saved for an iteration, in order.
+# 'Iteration' -> The iteration number.
+# 'Infected' -> The amount of infected entities.
+# 'Healed' -> The amount of healed entities.
+# 'Immune' -> The amount of immune entities.
+# 'Healthy' -> The amount of healthy entities.
+# 'Symptomatic' -> The amount of symptomatic entities.
+# 'Asymptomatic' -> The amount of asymptomatic entities.
+# 'Severe' -> The amount of severe mortality status.
+# 'Normal' -> The amount of normal mortality status.
+# 'Dead' -> The amount of dead entities.
+STATISTICS_COLUMNS: tuple[str, ...] = ('Iteration', 'Infected', 'Healed', 'Immune', 'Healthy', 'Symptomatic', 'Asymptomatic', 'Severe', 'Normal', 'Dead')
+
+# The size of the .npy header, big enough to be rewritten in place as rows are added.
+NPY_HEADER_SIZE: int = 512
+
+
+class StatisticsSink:
+    """Represents where the statistics of every iteration go, this one drops them (no output)."""
+
+    def write_row(self, row: tuple[int, ...]) -> None:
+        """Store the statistics of one iteration."""
+
+    def flush(self) -> None:
+        """Write every stored row."""
+
+    def close(self) -> None:
+        """Write every stored row and release this sink."""
+        self.flush()
+
+
+class BufferedStatisticsSink(StatisticsSink, ABC):
+    """Represents a sink keeping rows in a preallocated array, written every time it gets full."""
+
+    def __init__(self, path: str, batch_size: int = 1024) -> None:
+        """Initializes a buffered sink and creates its file.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file where the rows are written.
+        batch_size : int
+            How many rows are kept in memory before being written.
+        """
+        self.path: str = path
+        self.buffer: np.ndarray = np.zeros(shape=(batch_size, len(STATISTICS_COLUMNS)), dtype=np.int64)
+        self.row_amount: int = 0
+        self.create_file()
+
+    @abstractmethod
+    def create_file(self) -> None:
+        """Creates the file of this sink, without any row."""
+
+    @abstractmethod
+    def write_rows(self, rows: np.ndarray) -> None:
+        """Append rows to the file of this sink."""
+
+    def write_row(self, row: tuple[int, ...]) -> None:
+        """Store the statistics of one iteration."""
+        self.buffer[self.row_amount] = row
+        self.row_amount += 1
+        if self.row_amount == len(self.buffer):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write every stored row."""
+        if self.row_amount:
+            self.write_rows(rows=self.buffer[:self.row_amount])
+            self.row_amount = 0
+
+
+class CsvStatisticsSink(BufferedStatisticsSink):
+    """Represents a sink writing rows in a .csv file."""
+
+    def create_file(self) -> None:
+        """Creates the .csv file with only the headers."""
+        with open(file=self.path, mode='w', encoding='utf-8') as file:
+            file.write(','.join(STATISTICS_COLUMNS) + '\n')
+            file.close()
+
+    def write_rows(self, rows: np.ndarray) -> None:
+        """Append rows to the .csv file."""
+        with open(file=self.path, mode='a', encoding='utf-8') as file:
+            np.savetxt(file, rows, fmt='%d', delimiter=',')
+            file.close()
+
+
+class NpyStatisticsSink(BufferedStatisticsSink):
+    """Represents a sink writing rows in a .npy file, one named int64 field per column.
+
+    The header is rewritten after every batch, so the file is always a valid
+    array that can be memory-mapped, e.g. `np.load(path, mmap_mode='r')['Infected']`.
+    """
+
+    dtype: np.dtype = np.dtype([(column, '<i8') for column in STATISTICS_COLUMNS])
+
+    def __init__(self, path: str, batch_size: int = 1024) -> None:
+        self.written_row_amount: int = 0
+        super().__init__(path=path, batch_size=batch_size)
+
+    def write_header(self, file) -> None:
+        """Write (or rewrite) the .npy header with the amount of written rows."""
+        header = repr({'descr': np.lib.format.dtype_to_descr(self.dtype), 'fortran_order': False, 'shape': (self.written_row_amount,)})
+        # Magic string, version and header length take 10 bytes, the header ends with a new line.
+        header = header.ljust(NPY_HEADER_SIZE - 10 - 1) + '\n'
+        file.seek(0)
+        file.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode(encoding='latin1'))
+
+    def create_file(self) -> None:
+        """Creates the .npy file without any row."""
+        with open(file=self.path, mode='wb') as file:
+            self.write_header(file=file)
+            file.close()
+
+    def write_rows(self, rows: np.ndarray) -> None:
+        """Append rows to the .npy file and update its header."""
+        with open(file=self.path, mode='r+b') as file:
+            file.seek(0, 2)
+            file.write(np.ascontiguousarray(rows).tobytes())
+            self.written_row_amount += len(rows)
+            self.write_header(file=file)
+            file.close()
+
+
+def create_statistics_sink(path: str | None) -> StatisticsSink:
+    """Creates the sink matching a path: no output without one, binary for a .npy file, .csv otherwise."""
+    if path is None:
+        return StatisticsSink()
+    if path.endswith('.npy'):
+        return NpyStatisticsSink(path=path)
+    return CsvStatisticsSink(path=path)
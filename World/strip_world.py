@@ -0,0 +1,212 @@
+"""Module responsible for a world split in horizontal strips, held in
+shared memory and stepped in parallel by worker processes."""
+from multiprocessing import Pool, shared_memory
+import weakref
+import numpy as np
+
+
+from Entity.entity_type import ENTITY_TYPE_CODES, EntityType
+from Entity.random_stream import RandomStream
+from World.array_world import ArrayWorld, ADJACENT_OFFSETS, RANDOMS_PER_INFECTED, TILE_FIELDS
+from World.infected_index import InfectedIndex
+from World.population_counters import PopulationCounters
+
+
+# Every phase of a strip iteration, in the order they run.
+STRIP_PHASES: tuple[str, ...] = ('step', 'collect')
+
+# The world of a worker process, attached to the shared memory of the coordinating world.
+worker_world: 'StripWorld | None' = None
+
+
+def attach_worker_world(shape: tuple[int, int], shared_memory_names: dict[str, str]) -> None:
+    """Attach the worker process to the shared tile arrays of a strip world."""
+    # pylint: disable=W0603
+    global worker_world
+    world = StripWorld.__new__(StripWorld)
+    world.shape = shape
+    world.shared_memories = []
+    for field, dtype in StripWorld.tile_fields.items():
+        memory = shared_memory.SharedMemory(name=shared_memory_names[field])
+        world.shared_memories.append(memory)
+        setattr(world, field, np.ndarray(shape=shape, dtype=dtype, buffer=memory.buf))
+    worker_world = world
+
+
+def step_strip(task: tuple[str, int, int, tuple[int, ...]]) -> tuple[PopulationCounters, np.ndarray | None]:
+    """Run one phase of an iteration on one strip, in a worker process.
+
+    Returns the change in population counters made by this phase and, for the
+    'collect' phase, the flat position of every infected entity of the strip.
+    """
+    phase, first_row, last_row, seed = task
+    world = worker_world
+    world.counters = world.create_counters()
+    world.infected_index = InfectedIndex()
+    world.random_stream = RandomStream(seed=seed)
+    infected_positions = None
+    if phase == 'step':
+        world.step_strip_entities(first_row=first_row, last_row=last_row)
+    else:
+        infected_positions = world.collect_strip(first_row=first_row, last_row=last_row)
+    return world.counters, infected_positions
+
+
+def release_resources(resources: dict) -> None:
+    """Stop the worker processes and free the shared memory of a strip world."""
+    if resources['pool'] is not None:
+        resources['pool'].terminate()
+        resources['pool'].join()
+        resources['pool'] = None
+    for memory in resources['shared_memories']:
+        memory.unlink()
+        try:
+            memory.close()
+        except BufferError:
+            # Arrays still exported from this memory, it's unmapped once they're gone.
+            pass
+    resources['shared_memories'].clear()
+
+
+class StripWorld(ArrayWorld):
+    """Represents an array-backed world split in horizontal strips, stepped by a pool of processes.
+
+    Every tile array lives in shared memory. An iteration runs in phases, every
+    phase is a barrier over the strips:
+
+    - step: strips step their infected entities as the batched
+      `next_iteration`, an entity infecting and moving into the rows just
+      above and below its strip (halo rows), strips of the same color never
+      touch the same rows, so colors run one after the other;
+    - collect: each strip reports its infected positions.
+
+    Every strip draws from its own stream, seeded by the world seed, the
+    iteration, the strip and the phase, so a run only depends on its seed and
+    its amount of processes.
+    """
+
+    # Every per-tile field, plus the flag of the entities that didn't move yet this iteration.
+    tile_fields: dict[str, type] = {**TILE_FIELDS, 'movers': np.bool_}
+
+    # pylint: disable=R0913
+    def __init__(self, shape: int, immune_fraction: float = 0.05, initial_infected: int = 1, seed: int | None = None, data_file_path: str | None = 'world_data.csv', processes: int = 2, check_counters: bool = False) -> None:
+        """Initializes a world split in strips.
+
+        Parameters
+        ----------
+        shape : int
+            The amount of rows and columns of this world.
+        immune_fraction : float
+            The fraction of the (not initially infected) population that is immune.
+        initial_infected : int
+            The amount of initially infected entities.
+        seed : int | None
+            The seed of every random number drawn by this world and its entities.
+        data_file_path : str | None
+            The path of the data file where every iteration state is saved, a
+            .npy file is written in binary, None writes no file.
+        processes : int
+            The amount of worker processes, and of strips.
+        check_counters : bool
+            If the population counters should be checked against a full scan
+            of the world every time the state is saved (debug mode).
+        """
+        if processes < 1 or shape < 2 * processes:
+            raise ValueError(f'A world with {shape} rows can\'t be split in {processes} strips of at least 2 rows.')
+        self.processes: int = processes
+        self.shared_memory_names: dict[str, str] = {}
+        self.resources: dict = {'pool': None, 'shared_memories': []}
+        weakref.finalize(self, release_resources, self.resources)
+        super().__init__(shape=shape, immune_fraction=immune_fraction, initial_infected=initial_infected, seed=seed, data_file_path=data_file_path, batched=True, check_counters=check_counters)
+
+        # The first and last (exclusive) row of every strip.
+        boundaries = np.linspace(start=0, stop=self.shape[0], num=processes + 1).astype(int)
+        self.strips: list[tuple[int, int]] = list(zip(boundaries[:-1].tolist(), boundaries[1:].tolist()))
+        # Neighbor strips get different colors, the world being circular an odd amount of strips needs a third one.
+        self.strip_colors: list[int] = [index % 2 for index in range(processes)]
+        if processes > 1 and processes % 2 == 1:
+            self.strip_colors[-1] = 2
+        self.seed_entropy: int = int(self.random_stream.generator.integers(low=0, high=np.iinfo(np.int64).max))
+        del boundaries
+
+    def allocate_field(self, field: str, dtype: type) -> np.ndarray:
+        """Allocates a zeroed array with the world shape for a tile field, in shared memory."""
+        memory = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(self.shape)) * np.dtype(dtype).itemsize))
+        self.resources['shared_memories'].append(memory)
+        self.shared_memory_names[field] = memory.name
+        array = np.ndarray(shape=self.shape, dtype=dtype, buffer=memory.buf)
+        array.fill(0)
+        return array
+
+    @classmethod
+    def load_checkpoint(cls, directory: str, data_file_path: str | None = None, mmap_mode: str | None = 'c') -> ArrayWorld:
+        """Load a world from a checkpoint directory, as a batched `ArrayWorld` (strips only live in shared memory)."""
+        return ArrayWorld.load_checkpoint(directory=directory, data_file_path=data_file_path, mmap_mode=mmap_mode)
+
+    def record_events(self, directory: str, keyframe_every: int = 100) -> None:
+        """Not supported, tiles are changed by the worker processes (log a batched `ArrayWorld` instead)."""
+        raise ValueError('The changes of a StripWorld cannot be logged, use a batched ArrayWorld instead.')
+
+    def close(self) -> None:
+        """Writes every pending statistics row, stops the worker processes and frees the shared memory of this world."""
+        super().close()
+        for field in self.tile_fields:
+            if hasattr(self, field):
+                delattr(self, field)
+        release_resources(resources=self.resources)
+
+    def next_batched_iteration(self) -> None:
+        """Step into the next world iteration, every strip in parallel."""
+        self.save_state()
+        if self.resources['pool'] is None:
+            self.resources['pool'] = Pool(processes=self.processes, initializer=attach_worker_world, initargs=(self.shape, self.shared_memory_names))
+        profiler = self.profiler
+        infected_amount = len(self.infected_index)
+        # Only the entities infected at the start of this iteration move.
+        self.scatter(field='movers', flat_positions=self.infected_index.to_array(), values=True)
+        if profiler is not None:
+            # Transitions, infections and moves run in the same strip phase.
+            profiler.start_phase(phase='movement')
+        for color in sorted(set(self.strip_colors)):
+            self.run_phase(phase='step', strip_indexes=[index for index, strip_color in enumerate(self.strip_colors) if strip_color == color])
+        if profiler is not None:
+            profiler.end_phase(phase='movement', cells=infected_amount * (3 + len(ADJACENT_OFFSETS)))
+            profiler.start_phase(phase='scan')
+        infected_positions = self.run_phase(phase='collect', strip_indexes=range(len(self.strips)))
+        self.infected_index = InfectedIndex()
+        self.infected_index.update(flat_positions=np.concatenate(infected_positions), is_infected=np.ones(shape=sum(positions.size for positions in infected_positions), dtype=np.bool_))
+        if profiler is not None:
+            profiler.end_phase(phase='scan', cells=self.entity_types.size)
+        del infected_positions
+        self.iteration_step += 1
+        if profiler is not None:
+            profiler.end_iteration(iteration=self.iteration_step)
+
+    def run_phase(self, phase: str, strip_indexes: range | list[int]) -> list[np.ndarray]:
+        """Run a phase of this iteration on some strips and wait for all of them."""
+        tasks = [(phase, *self.strips[index], (self.seed_entropy, self.iteration_step, index, STRIP_PHASES.index(phase))) for index in strip_indexes]
+        results = self.resources['pool'].map(step_strip, tasks)
+        for counters, _ in results:
+            self.counters.merge(other=counters)
+        del tasks
+        return [infected_positions for _, infected_positions in results]
+
+    def get_strip_flat_positions(self, field: str, first_row: int, last_row: int) -> np.ndarray:
+        """Get the flat position of every tile of a strip whose (boolean) field is set."""
+        return np.flatnonzero(getattr(self, field)[first_row:last_row]) + first_row * self.shape[1]
+
+    def step_strip_entities(self, first_row: int, last_row: int) -> None:
+        """Step every infected entity of a strip that wasn't stepped yet this iteration, including the ones pushed into it."""
+        infected_positions = self.get_strip_flat_positions(field='movers', first_row=first_row, last_row=last_row)
+        while infected_positions.size:
+            self.scatter(field='movers', flat_positions=infected_positions, values=False)
+            draws = self.random_stream.randoms(size=(RANDOMS_PER_INFECTED, infected_positions.size))
+            self.increase_life_spans(infected_positions=infected_positions, death_draws=draws[0])
+            self.step_infected_tiles(infected_positions=infected_positions, move_draws=draws[1], status_draws=draws[2:].reshape(3, -1))
+            del draws
+            infected_positions = self.get_strip_flat_positions(field='movers', first_row=first_row, last_row=last_row)
+        del infected_positions
+
+    def collect_strip(self, first_row: int, last_row: int) -> np.ndarray:
+        """Get the flat position of every infected entity of a strip."""
+        return np.flatnonzero(self.entity_types[first_row:last_row] == ENTITY_TYPE_CODES[EntityType.INFECTED]) + first_row * self.shape[1]
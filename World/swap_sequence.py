@@ -0,0 +1,93 @@
+"""Module responsible for a sequence of tile swaps, applied one after the
+other, and for following where the entity of any tile ends up."""
+import numpy as np
+
+
+class SwapSequence:
+    """Represents many tile swaps applied in order, swap i exchanging the tiles `old_positions[i]` and `new_positions[i]`.
+
+    Every swap is stored once per tile, sorted by tile and then by swap, so
+    the swaps of a tile are found with a binary search. Following an entity
+    is hopping from the next swap of its tile to the other tile of that
+    swap, until no later swap touches its tile.
+    """
+
+    def __init__(self, old_positions: np.ndarray, new_positions: np.ndarray) -> None:
+        """Initializes a sequence of swaps.
+
+        Parameters
+        ----------
+        old_positions : np.ndarray
+            The flat position of the first tile of every swap, in order.
+        new_positions : np.ndarray
+            The flat position of the second tile of every swap, in order.
+        """
+        self.old_positions: np.ndarray = np.array(object=old_positions, dtype=np.int64)
+        self.new_positions: np.ndarray = np.array(object=new_positions, dtype=np.int64)
+        self.tiles, self.swaps, self.other_tiles = self.sort_entries(swaps=np.arange(self.old_positions.size))
+
+    def __len__(self) -> int:
+        """Get the amount of swaps of this sequence."""
+        return self.old_positions.size
+
+    def sort_entries(self, swaps: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get both tiles of some swaps, with the swap and the other tile of each, sorted by tile and then by swap."""
+        tiles = np.concatenate((self.old_positions[swaps], self.new_positions[swaps]))
+        other_tiles = np.concatenate((self.new_positions[swaps], self.old_positions[swaps]))
+        swaps = np.concatenate((swaps, swaps))
+        order = np.lexsort((swaps, tiles))
+        return tiles[order], swaps[order], other_tiles[order]
+
+    def is_entry_before(self, indexes: np.ndarray, tiles: np.ndarray, end_swaps: np.ndarray) -> np.ndarray:
+        """Get if every entry index holds a swap of its tile before its end swap (exclusive)."""
+        if not self.tiles.size:
+            return np.zeros(shape=indexes.size, dtype=np.bool_)
+        clipped_indexes = np.minimum(indexes, self.tiles.size - 1)
+        return (indexes < self.tiles.size) & (self.tiles[clipped_indexes] == tiles) & (self.swaps[clipped_indexes] < end_swaps)
+
+    def find_entries(self, tiles: np.ndarray, first_swaps: np.ndarray) -> np.ndarray:
+        """Get the index of the first entry of every tile from a swap on, or the index it would be inserted at."""
+        indexes = np.searchsorted(self.tiles, tiles)
+        # Tiles are only touched by a few swaps, so earlier ones are skipped one by one.
+        skipped = np.flatnonzero(self.is_entry_before(indexes=indexes, tiles=tiles, end_swaps=first_swaps))
+        while skipped.size:
+            indexes[skipped] += 1
+            skipped = skipped[self.is_entry_before(indexes=indexes[skipped], tiles=tiles[skipped], end_swaps=first_swaps[skipped])]
+        del skipped
+        return indexes
+
+    def replace(self, swaps: np.ndarray, old_positions: np.ndarray, new_positions: np.ndarray) -> None:
+        """Replace some swaps by swaps between other tiles, keeping their place in the sequence."""
+        is_replaced = np.zeros(shape=len(self), dtype=np.bool_)
+        is_replaced[swaps] = True
+        is_kept = ~is_replaced[self.swaps]
+        self.tiles, self.swaps, self.other_tiles = self.tiles[is_kept], self.swaps[is_kept], self.other_tiles[is_kept]
+        self.old_positions[swaps] = old_positions
+        self.new_positions[swaps] = new_positions
+        tiles, replaced_swaps, other_tiles = self.sort_entries(swaps=swaps)
+        indexes = self.find_entries(tiles=tiles, first_swaps=replaced_swaps)
+        self.tiles = np.insert(self.tiles, indexes, tiles)
+        self.swaps = np.insert(self.swaps, indexes, replaced_swaps)
+        self.other_tiles = np.insert(self.other_tiles, indexes, other_tiles)
+        del is_replaced, is_kept, tiles, replaced_swaps, other_tiles, indexes
+
+    def follow(self, positions: np.ndarray, end_swaps: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Follow the entity of every tile through the swaps before its end swap (exclusive).
+
+        Returns where every entity ends up and, for every tile an entity went
+        through (its first one included), the index of that entity and the tile.
+        """
+        positions = np.array(object=positions, dtype=np.int64)
+        first_swaps = np.zeros(shape=positions.size, dtype=np.int64)
+        followed = np.arange(positions.size)
+        visitors, visited_tiles = [followed], [positions.copy()]
+        while followed.size:
+            indexes = self.find_entries(tiles=positions[followed], first_swaps=first_swaps[followed])
+            is_swapped = self.is_entry_before(indexes=indexes, tiles=positions[followed], end_swaps=end_swaps[followed])
+            followed, indexes = followed[is_swapped], indexes[is_swapped]
+            positions[followed] = self.other_tiles[indexes]
+            first_swaps[followed] = self.swaps[indexes] + 1
+            visitors.append(followed)
+            visited_tiles.append(positions[followed])
+            del indexes, is_swapped
+        return positions, np.concatenate(visitors), np.concatenate(visited_tiles)
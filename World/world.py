@@ -2,11 +2,14 @@
 such as it's dimension and living entities."""
 from functools import reduce
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.colors import ListedColormap
 
 
 from Entity.entity import Entity
+from Entity.entity_type import ENTITY_TYPE_CODES, EntityType
+from Entity.random_stream import RandomStream
+from World.profiler import IterationProfiler
+from World.renderer import FrameRecorder, LiveRenderer, downsample
+from World.statistics_sink import StatisticsSink, create_statistics_sink
 
 
 class World:
@@ -14,137 +17,187 @@ class World:
 
     iteration_step: int = 0
 
-    def __init__(self, shape: int) -> None:
+    # The live plot and the off-screen recording of this world, if any.
+    renderer: LiveRenderer | None = None
+    frame_recorder: FrameRecorder | None = None
+
+    # The profiler timing every iteration phase, if any.
+    profiler: IterationProfiler | None = None
+
+    def __init__(self, shape: int, immune_fraction: float = 0.05, initial_infected: int = 1, seed: int | None = None, data_file_path: str | None = 'world_data.csv') -> None:
+        """Initializes a world with random living entities.
+
+        Parameters
+        ----------
+        shape : int
+            The amount of rows and columns of this world.
+        immune_fraction : float
+            The fraction of the (not initially infected) population that is immune.
+        initial_infected : int
+            The amount of initially infected entities.
+        seed : int | None
+            The seed of every random number drawn by this world and its entities.
+        data_file_path : str | None
+            The path of the data file where every iteration state is saved, a
+            .npy file is written in binary, None writes no file.
+        """
         self.shape: tuple[int, int] = (shape, shape)
-        self.tiles: np.ndarray = np.empty(shape=self.shape, dtype=object)
-        self.add_immune_entities()
-        self.add_infected_entity()
+        self.data_file_path: str | None = data_file_path
+        self.random_stream: RandomStream = RandomStream(seed=seed)
+        self.immune_fraction: float = immune_fraction
+        self.initial_infected: int = initial_infected
+        self.create_tiles()
+        infected_positions, immune_positions = self.choose_initial_positions()
+        self.add_immune_entities(flat_positions=immune_positions)
+        self.add_infected_entities(flat_positions=infected_positions)
+        del infected_positions, immune_positions
         self.add_healthy_entities()
         self.create_data_file()
 
-    def show_current_iteration_world_state(self) -> None:
-        """Draws the current world state in a plot."""
-        converted_tiles = np.vectorize(pyfunc=lambda entity: entity.entity_type.name)(self.tiles)
-        unique_values = np.unique(converted_tiles)
-        entity_type_matching_number = {entity_type: value for value, entity_type in enumerate(iterable=unique_values)}
-        converted_numeric_tiles = np.vectorize(pyfunc=lambda entity_type: entity_type_matching_number[entity_type])(converted_tiles)
-
-        # Colormap for every entity map.
-        color_map = {'HEALTHY': 'lightgreen', 'IMMUNE': 'pink', 'INFECTED': 'salmon', 'DEAD': 'black', 'HEALED': 'lightgreen'}
-        colors = [color_map[entity_type_name] for entity_type_name in unique_values]
+    def create_tiles(self) -> None:
+        """Creates the empty grid of tiles for this world."""
+        self.tiles: np.ndarray = np.empty(shape=self.shape, dtype=object)
 
-        plt.imshow(X=converted_numeric_tiles, cmap=ListedColormap(colors=colors), interpolation='nearest', extent=[0, 20, 0, 20])
+    def get_entity_type_codes(self) -> np.ndarray:
+        """Get a grid with the entity type code of every tile in this world."""
+        return np.vectorize(pyfunc=lambda entity: ENTITY_TYPE_CODES[entity.entity_type], otypes=[np.uint8])(self.tiles)
 
-        # Creates a legend for every entity type.
-        legend_labels = list(entity_type_matching_number.keys())
-        legend_handles = [plt.Rectangle((0, 0), 1, 1, color=color) for color in colors]
-        plt.legend(legend_handles, legend_labels, loc='upper right', bbox_to_anchor=(1.35, 1))
+    def get_downsampled_entity_type_codes(self, max_size: int) -> np.ndarray:
+        """Get a grid with the entity type code of one tile every few tiles, so it fits in max_size x max_size (see `downsample`)."""
+        return downsample(entity_type_codes=self.get_entity_type_codes(), max_size=max_size)
 
-        del converted_tiles, unique_values, entity_type_matching_number, converted_numeric_tiles
+    def show_current_iteration_world_state(self) -> None:
+        """Draws the current world state in a plot, updating the same image every iteration."""
+        if self.renderer is None:
+            self.renderer = LiveRenderer()
+        self.renderer.draw(world=self)
 
-        # Remove the X and Y-axis metrics.
-        plt.xticks(ticks=[])
-        plt.yticks(ticks=[])
+    def record_frames(self, path: str, every: int = 1, max_size: int = 1000) -> None:
+        """Record the world state into an animated .gif or video file, every some iterations, off-screen."""
+        if self.frame_recorder is not None:
+            self.frame_recorder.close()
+        self.frame_recorder = FrameRecorder(path=path, every=every, max_size=max_size)
 
-        # Show the heatmap and set the interval between the plots.
-        plt.show(block=False)
-        plt.pause(interval=0.25)
+    def set_profiler(self, profiler: IterationProfiler | None) -> None:
+        """Time every phase of the following iterations with a profiler, or stop profiling them if None."""
+        self.profiler = profiler
 
     def next_iteration(self) -> None:
-        """Step into the next world iteration."""
+        """Step into the next world iteration.
+
+        Every entity infected at the start of the iteration is stepped once,
+        in order, even when an earlier entity displaced it.
+        """
+        profiler = self.profiler
         self.save_state()
-        target_entity_type = Entity(position=(-1, -1), is_infected=True, is_immune=False).entity_type
-        infected_entities_positions = self.get_matching_entity_type_positions(target_entity_type=target_entity_type)
-        del target_entity_type
-        for position in infected_entities_positions:
-            infected_entity = self.get_tile(position=position)
-            infected_entity.increase_life_span()
-            self.infect_neighbors(infected_entity=infected_entity)
-            self.move_infected_entity(infected_entity=infected_entity)
+        if profiler is not None:
+            profiler.start_phase(phase='scan')
+        infected_entities = self.get_infected_entities()
+        if profiler is not None:
+            profiler.end_phase(phase='scan', cells=self.scanned_tile_amount())
+        for infected_entity in infected_entities:
+            if profiler is None:
+                infected_entity.increase_life_span()
+                self.infect_neighbors(infected_entity=infected_entity)
+                self.move_infected_entity(infected_entity=infected_entity)
+            else:
+                profiler.start_phase(phase='transition')
+                infected_entity.increase_life_span()
+                profiler.end_phase(phase='transition', cells=1)
+                profiler.start_phase(phase='infection')
+                self.infect_neighbors(infected_entity=infected_entity)
+                profiler.end_phase(phase='infection', cells=4)
+                profiler.start_phase(phase='movement')
+                self.move_infected_entity(infected_entity=infected_entity)
+                profiler.end_phase(phase='movement', cells=2)
             del infected_entity
-        del infected_entities_positions
+        del infected_entities
         self.iteration_step += 1
+        if profiler is not None:
+            profiler.end_iteration(iteration=self.iteration_step)
 
-    def create_data_file(self) -> None:
-        """Creates an .csv data file for this world with only the headers."""
-        with open(file='world_data.csv', mode='w', encoding='utf-8') as file:
-            # 'Iteration' -> The iteration number.
-            # 'Infected' -> The amount of infected entities.
-            # 'Healed' -> The amount of healed entities.
-            # 'Immune' -> The amount of immune entities.
-            # 'Healthy' -> The amount of healthy entities.
-            # 'Symptomatic' -> The amount of symptomatic entities.
-            # 'Asymptomatic' -> The amount of asymptomatic entities.
-            # 'Severe' -> The amount of severe mortality status.
-            # 'Normal' -> The amount of normal mortality status.
-            # 'Dead' -> The amount of dead entities.
-            file.write('Iteration,Infected,Healed,Immune,Healthy,Symptomatic,Asymptomatic,Severe,Normal,Dead\n')
-            file.close()
+    def scanned_tile_amount(self) -> int:
+        """Get how many tiles are visited to find the infected entities."""
+        return self.shape[0] * self.shape[1]
 
-    def save_state(self) -> None:
-        """Saves the current world state in 'world_state.txt'."""
-        with open(file='world_data.csv', mode='a', encoding='utf-8') as file:
+    def create_data_file(self) -> None:
+        """Creates the statistics sink of this world, matching its data file path."""
+        self.statistics_sink: StatisticsSink = create_statistics_sink(path=self.data_file_path)
+
+    def collect_statistics(self) -> tuple[int, ...]:
+        """Get the current world statistics, in the order of `STATISTICS_COLUMNS`."""
+        healed_count = self.count_entity_type(target_entity_type=EntityType.HEALED)
+        immune_count = self.count_entity_type(target_entity_type=EntityType.IMMUNE)
+        healthy_count = self.count_entity_type(target_entity_type=EntityType.HEALTHY)
+        return (
             # Current iteration.
-            file.write(f'{self.iteration_step},')
+            self.iteration_step,
             # Infected entity count.
-            infected_target_entity_type = Entity(position=(-1, -1), is_infected=True, is_immune=False).entity_type
-            infected_count = len(self.get_matching_entity_type_positions(target_entity_type=infected_target_entity_type))
-            file.write(f'{infected_count},')
-            del infected_target_entity_type, infected_count
+            self.count_entity_type(target_entity_type=EntityType.INFECTED),
             # Healed entity count.
-            healed_target_entity_type = Entity(position=(-1, -1), is_infected=True, is_immune=False)
-            healed_target_entity_type.heal()
-            healed_target_entity_type = healed_target_entity_type.entity_type
-            healed_count = len(self.get_matching_entity_type_positions(target_entity_type=healed_target_entity_type))
-            file.write(f'{healed_count},',)
+            healed_count,
             # Immune entity count.
-            immune_target_entity_type = Entity(position=(-1, -1), is_infected=False, is_immune=True).entity_type
-            immune_count = len(self.get_matching_entity_type_positions(target_entity_type=immune_target_entity_type))
-            file.write(f'{immune_count+healed_count},')
+            immune_count + healed_count,
             # Healthy entity count.
-            healthy_target_entity_type = Entity(position=(-1, -1), is_infected=False, is_immune=False).entity_type
-            healthy_count = len(self.get_matching_entity_type_positions(target_entity_type=healthy_target_entity_type))
-            file.write(f'{healthy_count+immune_count+healed_count},')
-            del healthy_target_entity_type, healthy_count, immune_target_entity_type, immune_count, healed_target_entity_type, healed_count
+            healthy_count + immune_count + healed_count,
             # Symptomatic status count.
-            file.write(f'{self.count_symptom_status(target_symptom_status="SINTOMÁTICO")},')
+            self.count_symptom_status(target_symptom_status='SINTOMÁTICO'),
             # Asymptomatic status count.
-            file.write(f'{self.count_symptom_status(target_symptom_status="ASSINTOMÁTICO")},')
+            self.count_symptom_status(target_symptom_status='ASSINTOMÁTICO'),
             # Severe status count.
-            file.write(f'{self.count_mortality_status(target_mortality_status="GRAVE")},')
+            self.count_mortality_status(target_mortality_status='GRAVE'),
             # Normal status count.
-            file.write(f'{self.count_mortality_status(target_mortality_status="NORMAL")},')
+            self.count_mortality_status(target_mortality_status='NORMAL'),
             # Dead status count.
-            dead_target_entity_type = Entity(position=(-1, -1), is_infected=True, is_immune=False)
-            dead_target_entity_type.die()
-            dead_target_entity_type = dead_target_entity_type.entity_type
-            dead_count = len(self.get_matching_entity_type_positions(target_entity_type=dead_target_entity_type))
-            file.write(f'{dead_count}\n')
-            del dead_target_entity_type, dead_count
-            # Close the file.
-            file.close()
+            self.count_entity_type(target_entity_type=EntityType.DEAD),
+        )
+
+    def save_state(self) -> None:
+        """Saves the current world state in this world's statistics sink (and recording)."""
+        if self.profiler is not None:
+            self.profiler.start_phase(phase='save_state')
+        self.statistics_sink.write_row(row=self.collect_statistics())
+        if self.frame_recorder is not None:
+            self.frame_recorder.record(world=self)
+        if self.profiler is not None:
+            self.profiler.end_phase(phase='save_state')
+
+    def flush(self) -> None:
+        """Writes every pending statistics row and frame, keeping this world's output open."""
+        self.statistics_sink.flush()
+        if self.frame_recorder is not None:
+            self.frame_recorder.flush()
+
+    def close(self) -> None:
+        """Writes every pending statistics row and frame and releases this world's output."""
+        self.statistics_sink.close()
+        if self.frame_recorder is not None:
+            self.frame_recorder.close()
+            self.frame_recorder = None
 
     def get_world_size(self) -> int:
         """Get the world size."""
-        return np.random.choice(a=self.shape)
+        return self.shape[self.random_stream.integer(high=len(self.shape))]
 
     def get_tile(self, position: tuple[int, int]) -> Entity:
         """Get the content at a specified tile by its position."""
         return self.tiles[position]
 
     def swap_tiles(self, old_pos: tuple[int, int], new_pos: tuple[int, int]) -> None:
-        """Swap the information between two tiles in this world."""
+        """Swap the information between two tiles in this world, both entities knowing their new position."""
         self.tiles[new_pos], self.tiles[old_pos] = self.tiles[old_pos], self.tiles[new_pos]
+        # The displaced entity would otherwise keep infecting (and moving) from its previous tile.
+        self.tiles[new_pos].position, self.tiles[old_pos].position = new_pos, old_pos
 
     def update_tile(self, position: tuple[int, int], is_infected: bool, is_immune: bool) -> None:
         """Spawn a new entity in a tile."""
-        self.tiles[position] = Entity(position=position, is_infected=is_infected, is_immune=is_immune)
+        self.tiles[position] = Entity(position=position, is_infected=is_infected, is_immune=is_immune, random_stream=self.random_stream)
 
     def get_random_tile(self) -> tuple[int, int]:
         """Randomly select a tile and return its position."""
         rows, cols = self.shape
-        tile_x = np.random.randint(low=0, high=rows)
-        tile_y = np.random.randint(low=0, high=cols)
+        tile_x = self.random_stream.integer(high=rows)
+        tile_y = self.random_stream.integer(high=cols)
         del rows, cols
         return tile_x, tile_y
 
@@ -176,16 +229,36 @@ class World:
         del mask, indexes
         return count
 
-    def add_immune_entities(self) -> None:
-        """Transform 5% of population into immune healthy entities."""
-        immune_entities_amount = int(np.round((reduce(np.multiply, self.shape) - 1) * 0.05))
-        while immune_entities_amount > 0:
-            tile_x, tile_y = self.get_random_tile()
-            if self.is_tile_empty(position=(tile_x, tile_y)):
-                self.update_tile(position=(tile_x, tile_y), is_infected=False, is_immune=True)
-                immune_entities_amount -= 1
-            del tile_x, tile_y
-        del immune_entities_amount
+    def choose_initial_positions(self) -> tuple[np.ndarray, np.ndarray]:
+        """Randomly choose, at once, the flat positions of the initially infected and immune entities."""
+        tile_amount = int(reduce(np.multiply, self.shape))
+        if not 0 <= self.initial_infected <= tile_amount:
+            raise ValueError(f'The amount of initially infected entities must be between 0 and {tile_amount}.')
+        immune_amount = int(np.round((tile_amount - self.initial_infected) * self.immune_fraction))
+        flat_positions = self.random_stream.generator.choice(a=tile_amount, size=self.initial_infected + immune_amount, replace=False)
+        del tile_amount, immune_amount
+        return flat_positions[:self.initial_infected], flat_positions[self.initial_infected:]
+
+    def add_immune_entities(self, flat_positions: np.ndarray) -> None:
+        """Transform the entities at every flat position into immune healthy entities."""
+        for tile_x, tile_y in zip(*np.unravel_index(flat_positions, self.shape)):
+            self.update_tile(position=(tile_x, tile_y), is_infected=False, is_immune=True)
+
+    def count_entity_type(self, target_entity_type: EntityType) -> int:
+        """Count the amount of entities of a target entity type in this world."""
+        return len(self.get_matching_entity_type_positions(target_entity_type=target_entity_type))
+
+    def get_infected_positions(self) -> tuple[tuple[int, int], ...]:
+        """Get the position of every infected entity in this world."""
+        return self.get_matching_entity_type_positions(target_entity_type=EntityType.INFECTED)
+
+    def get_infected_entities(self) -> list[Entity]:
+        """Get every infected entity in this world, each one knowing its position even after being moved or displaced."""
+        return [self.get_tile(position=position) for position in self.get_infected_positions()]
+
+    def has_infected_entities(self) -> bool:
+        """Check if there is at least one infected entity in this world."""
+        return self.count_entity_type(target_entity_type=EntityType.INFECTED) >= 1
 
     def get_matching_entity_type_positions(self, target_entity_type: object) -> tuple[tuple[int, int], ...]:
         """Get the position of every matching entity type in this world."""
@@ -195,16 +268,10 @@ class World:
         del mask, indexes
         return positions
 
-    def add_infected_entity(self) -> None:
-        """Transform one random entity into a infected entity."""
-        spawned_infected_entity = False
-        while not spawned_infected_entity:
-            tile_x, tile_y = self.get_random_tile()
-            if self.is_tile_empty(position=(tile_x, tile_y)):
-                self.update_tile(position=(tile_x, tile_y), is_infected=True, is_immune=False)
-                spawned_infected_entity = True
-            del tile_x, tile_y
-        del spawned_infected_entity
+    def add_infected_entities(self, flat_positions: np.ndarray) -> None:
+        """Transform the entities at every flat position into infected entities."""
+        for tile_x, tile_y in zip(*np.unravel_index(flat_positions, self.shape)):
+            self.update_tile(position=(tile_x, tile_y), is_infected=True, is_immune=False)
 
     def move_infected_entity(self, infected_entity: Entity) -> None:
         """Randomly move an specified infected entity."""
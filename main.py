@@ -1,21 +1,90 @@
-import matplotlib.pyplot as plt
+"""Runs a single world, or a sweep over a grid of parameters, from the command line."""
+import argparse
+import ast
 
-from Entity.entity import Entity
+
+from Sweep.sweep import DEFAULT_CONFIGURATION, apply_epidemiological_parameters, run_sweep
+from World.array_world import MAX_INFECTION_DURATION, ArrayWorld
+from World.scheduled_world import ScheduledWorld
 from World.world import World
 
-world = World(shape=500)
 
-step = 0
-target_entity_type = Entity(position=(-1, -1), is_infected=True, is_immune=False).entity_type
-while len(world.get_matching_entity_type_positions(target_entity_type=target_entity_type)) >= 1:
-    # Shows, in real-time, at every iteration the world state.
-    # world.show_current_iteration_world_state()
-    world.next_iteration()
+# Every world that can run, by name.
+WORLD_CLASSES: dict[str, type] = {'world': World, 'array': ArrayWorld, 'batched': ArrayWorld, 'scheduled': ScheduledWorld}
+
+
+def parse_sweep_grid(assignments: list[str]) -> dict[str, list]:
+    """Turn every 'parameter=value,value,...' assignment into a grid of parameter values."""
+    grid = {}
+    for assignment in assignments:
+        parameter, _, values = assignment.partition('=')
+        if not values:
+            raise ValueError(f'Expected "parameter=value,value,..." but got "{assignment}".')
+        grid[parameter.strip().replace('-', '_')] = [ast.literal_eval(value.strip()) for value in values.split(',')]
+    return grid
+
+
+def run_world(configuration: dict, world_name: str, data_file_path: str | None, frames_path: str | None, show: bool, quiet: bool) -> None:
+    """Run a single world until no infected entity remains (or the step limit)."""
+    apply_epidemiological_parameters(configuration=configuration)
+    world_arguments = {
+        'shape': configuration['shape'],
+        'immune_fraction': configuration['immune_fraction'],
+        'initial_infected': configuration['initial_infected'],
+        'seed': configuration['seed'],
+        'data_file_path': data_file_path,
+    }
+    if world_name == 'batched':
+        world_arguments['batched'] = True
+    world = WORLD_CLASSES[world_name](**world_arguments)
+    if frames_path is not None:
+        world.record_frames(path=frames_path)
+
+    while world.has_infected_entities() and (configuration['max_steps'] is None or world.iteration_step < configuration['max_steps']):
+        if show:
+            # Shows, in real-time, at every iteration the world state.
+            world.show_current_iteration_world_state()
+        world.next_iteration()
+
+        if not quiet:
+            print(f'Step # {world.iteration_step - 1} done.')
+    world.save_state()
+    world.close()
+
+    if show:
+        # pylint: disable=C0415
+        import matplotlib.pyplot as plt
+        # Assures that the last plot will not be closed automatically.
+        plt.show()
 
-    print(f'Step # {step} done.')
-    step += 1
 
-# Assures that the last plot will not be closed automatically.
-plt.show()
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Runs a world until no infected entity remains, or a sweep over a grid of parameters.')
+    parser.add_argument('--shape', type=int, default=DEFAULT_CONFIGURATION['shape'], help='The amount of rows and columns of the world.')
+    parser.add_argument('--seed', type=int, default=DEFAULT_CONFIGURATION['seed'], help='The seed of every random number.')
+    parser.add_argument('--max-steps', type=int, default=DEFAULT_CONFIGURATION['max_steps'], help='The maximum amount of iterations.')
+    parser.add_argument('--immune-fraction', type=float, default=DEFAULT_CONFIGURATION['immune_fraction'], help='The fraction of the population that starts immune.')
+    parser.add_argument('--initial-infected', type=int, default=DEFAULT_CONFIGURATION['initial_infected'], help='The amount of initially infected entities.')
+    parser.add_argument('--infection-duration', type=int, default=DEFAULT_CONFIGURATION['infection_duration'], help='The maximum span an entity is infected.')
+    parser.add_argument('--symptomatic-probability', type=float, default=DEFAULT_CONFIGURATION['symptomatic_probability'], help='The probability of an infected entity being symptomatic.')
+    parser.add_argument('--severe-probability', type=float, default=DEFAULT_CONFIGURATION['severe_probability'], help='The probability of a symptomatic entity being severe.')
+    parser.add_argument('--death-probability', type=float, default=DEFAULT_CONFIGURATION['death_probability'], help='The probability of a severe entity dying when infected.')
+    parser.add_argument('--world', choices=list(WORLD_CLASSES), default='batched', help='The world that runs (a sweep always runs batched worlds).')
+    parser.add_argument('--data-file', default='world_data.csv', help='Where every iteration state is saved, .npy for binary.')
+    parser.add_argument('--frames', default=None, help='Record the world into this .gif or video file.')
+    parser.add_argument('--show', action='store_true', help='Show the world state at every iteration in a plot.')
+    parser.add_argument('--quiet', action='store_true', help='Don\'t print every iteration.')
+    parser.add_argument('--sweep', nargs='+', default=None, metavar='PARAMETER=VALUES', help='Run every combination of these parameters instead, such as "infection_duration=10,20".')
+    parser.add_argument('--sweep-directory', default='sweep', help='Where every sweep run is cached, by configuration hash.')
+    parser.add_argument('--processes', type=int, default=None, help='The amount of sweep worker processes (every core by default).')
+    arguments = parser.parse_args()
+    if not 0 <= arguments.infection_duration <= MAX_INFECTION_DURATION:
+        parser.error(f'--infection-duration must be between 0 and {MAX_INFECTION_DURATION}.')
+    base_configuration = {parameter: getattr(arguments, parameter) for parameter in DEFAULT_CONFIGURATION}
 
-pass
\ No newline at end of file
+    if arguments.sweep is None:
+        run_world(configuration=base_configuration, world_name=arguments.world, data_file_path=arguments.data_file, frames_path=arguments.frames, show=arguments.show, quiet=arguments.quiet)
+    else:
+        for sweep_configuration, sweep_data_file_path, is_cached in run_sweep(grid=parse_sweep_grid(assignments=arguments.sweep), directory=arguments.sweep_directory, base_configuration=base_configuration, processes=arguments.processes):
+            swept_values = ' '.join(f'{parameter}={sweep_configuration[parameter]}' for parameter in parse_sweep_grid(assignments=arguments.sweep))
+            print(f'{swept_values} -> {sweep_data_file_path}{" (cached)" if is_cached else ""}')
@@ -0,0 +1,118 @@
+"""Tests of the array-backed world."""
+import numpy as np
+import pytest
+
+
+from Ensemble.ensemble import read_data_file
+from Entity.random_stream import RandomStream
+from World.array_world import ArrayWorld, RANDOMS_PER_INFECTED, get_status_code
+from World.event_log import EventLogReader
+from world_statistics import assert_same_statistics, run_seeded_worlds
+
+
+@pytest.mark.parametrize('batched', [False, True])
+def test_counters_match_a_full_scan(batched: bool) -> None:
+    world = ArrayWorld(shape=30, seed=3, data_file_path=None, batched=batched, check_counters=True)
+    while world.has_infected_entities():
+        world.next_iteration()
+    world.save_state()
+
+
+class ScriptedStream(RandomStream):
+    """Represents a stream handing out the same value every time, except for the moves, taken in order from a script."""
+
+    def __init__(self, value: float, moves: list[int]) -> None:
+        super().__init__(seed=0)
+        self.value: float = value
+        self.moves: list[int] = moves
+
+    def random(self) -> float:
+        return self.value
+
+    def randoms(self, size: int | tuple[int, ...]) -> np.ndarray:
+        return np.full(shape=size, fill_value=self.value)
+
+    def integer(self, high: int) -> int:
+        # Only a move picks one of the four adjacent offsets.
+        return self.moves.pop(0) if high == 4 else int(self.value * high)
+
+
+def create_scripted_world(infected_positions: list[int], severe_positions: list[int], moves: list[int], batched: bool) -> ArrayWorld:
+    """Create a 5x5 world with infected entities at every flat position, some of them severe, whose moves follow a script."""
+    world = ArrayWorld(shape=5, immune_fraction=0.3, initial_infected=0, seed=0, data_file_path=None, batched=batched)
+    world.random_stream = ScriptedStream(value=0.5, moves=list(moves))
+    world.add_infected_entities(flat_positions=np.array(infected_positions, dtype=np.int64))
+    world.scatter(field='symptom_statuses', flat_positions=np.array(severe_positions, dtype=np.int64), values=get_status_code(field='symptom_statuses', status='SINTOMÁTICO'))
+    world.scatter(field='mortality_statuses', flat_positions=np.array(severe_positions, dtype=np.int64), values=get_status_code(field='mortality_statuses', status='GRAVE'))
+    # Every life span is different, so moved entities can be told apart.
+    world.life_spans[:] = np.arange(25).reshape(5, 5) * 10
+    return world
+
+
+@pytest.mark.parametrize('case', range(200))
+def test_batched_kernel_steps_entities_as_per_entity_iterations(case: int) -> None:
+    generator = np.random.default_rng(seed=case)
+    if case == 0:
+        # Moving the entity at 12 right, the one at 13 left and the one at 16 up.
+        infected_positions, moves = [12, 13, 16], [3, 2, 1]
+    else:
+        infected_positions = np.sort(generator.choice(25, size=generator.integers(1, 26), replace=False)).tolist()
+        moves = generator.integers(0, 4, size=len(infected_positions)).tolist()
+    severe_positions = [position for position in infected_positions if generator.random() < 0.3]
+    # Severe entities die on their tick, and still move.
+    world = create_scripted_world(infected_positions=infected_positions, severe_positions=severe_positions, moves=moves, batched=False)
+    world.next_iteration()
+    batched_world = create_scripted_world(infected_positions=infected_positions, severe_positions=severe_positions, moves=moves, batched=True)
+    draws = np.full(shape=(RANDOMS_PER_INFECTED, len(infected_positions)), fill_value=0.5)
+    draws[1] = (np.array(moves) + 0.5) / 4
+    batched_world.random_stream.randoms = lambda size: draws
+    batched_world.next_iteration()
+    for field in world.tile_fields:
+        assert np.array_equal(getattr(world, field), getattr(batched_world, field)), field
+    assert np.array_equal(world.infected_index.to_array(), batched_world.infected_index.to_array())
+
+
+def test_batched_iterations_match_per_entity_iterations(tmp_path) -> None:
+    columns, runs = run_seeded_worlds(create_world=lambda **arguments: ArrayWorld(shape=30, **arguments), seeds=range(20), directory=str(tmp_path))
+    _, batched_runs = run_seeded_worlds(create_world=lambda **arguments: ArrayWorld(shape=30, batched=True, **arguments), seeds=range(20), directory=str(tmp_path))
+    assert_same_statistics(columns=columns, runs=runs, other_runs=batched_runs)
+
+
+def test_checkpoints_flush_the_data_file(tmp_path) -> None:
+    world = ArrayWorld(shape=30, seed=0, data_file_path=str(tmp_path / 'data.csv'), batched=True)
+    world.set_checkpoints(directory=str(tmp_path / 'checkpoints'), every=10)
+    world.record_events(directory=str(tmp_path / 'events'))
+    for _ in range(45):
+        world.next_iteration()
+    # Everything saved before the last checkpoint is on disk, even if the run never closes.
+    _, rows = read_data_file(data_file_path=str(tmp_path / 'data.csv'))
+    assert len(rows) >= 40
+    assert EventLogReader(directory=str(tmp_path / 'events')).last_iteration >= 40
+    world.close()
+
+
+@pytest.mark.parametrize('batched', [False, True])
+def test_resumed_runs_match_uninterrupted_runs(tmp_path, batched: bool) -> None:
+    world = ArrayWorld(shape=30, seed=4, data_file_path=str(tmp_path / 'uninterrupted.csv'), batched=batched)
+    while world.has_infected_entities():
+        world.next_iteration()
+    world.save_state()
+    world.close()
+
+    world = ArrayWorld(shape=30, seed=4, data_file_path=str(tmp_path / 'interrupted.csv'), batched=batched)
+    for _ in range(10):
+        world.next_iteration()
+    world.save_checkpoint(directory=str(tmp_path / 'checkpoint'))
+    world.close()
+    world = ArrayWorld.load_checkpoint(directory=str(tmp_path / 'checkpoint'), data_file_path=str(tmp_path / 'resumed.csv'))
+    while world.has_infected_entities():
+        world.next_iteration()
+    world.save_state()
+    world.close()
+
+    columns, rows = read_data_file(data_file_path=str(tmp_path / 'uninterrupted.csv'))
+    interrupted_columns, interrupted_rows = read_data_file(data_file_path=str(tmp_path / 'interrupted.csv'))
+    resumed_columns, resumed_rows = read_data_file(data_file_path=str(tmp_path / 'resumed.csv'))
+    assert columns == interrupted_columns == resumed_columns
+    assert len(interrupted_rows) == 10
+    assert np.array_equal(rows, np.concatenate((interrupted_rows, resumed_rows)))
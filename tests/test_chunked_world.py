@@ -0,0 +1,42 @@
+"""Tests of the world of lazily allocated blocks."""
+import numpy as np
+import pytest
+
+
+from Entity.entity_type import EntityType
+from World.array_world import ArrayWorld
+from World.chunked_world import ChunkedWorld
+from World.renderer import downsample
+from world_statistics import assert_same_statistics, run_seeded_worlds
+
+
+def test_chunked_world_matches_batched_world(tmp_path) -> None:
+    columns, runs = run_seeded_worlds(create_world=lambda **arguments: ArrayWorld(shape=30, batched=True, **arguments), seeds=range(24), directory=str(tmp_path))
+    # Blocks that don't divide the world, so cut blocks are stepped too.
+    _, chunked_runs = run_seeded_worlds(create_world=lambda **arguments: ChunkedWorld(shape=30, block_size=8, **arguments), seeds=range(24), directory=str(tmp_path))
+    assert_same_statistics(columns=columns, runs=runs, other_runs=chunked_runs)
+
+
+def test_counters_match_a_full_scan() -> None:
+    world = ChunkedWorld(shape=30, seed=3, data_file_path=None, block_size=8, check_counters=True)
+    while world.has_infected_entities():
+        world.next_iteration()
+    world.save_state()
+
+
+def test_downsampled_grid_matches_the_full_grid() -> None:
+    world = ChunkedWorld(shape=50, seed=1, data_file_path=None, block_size=8)
+    for _ in range(10):
+        world.next_iteration()
+    assert np.array_equal(world.get_downsampled_entity_type_codes(max_size=17), downsample(entity_type_codes=world.get_entity_type_codes(), max_size=17))
+
+
+def test_huge_worlds_are_never_allocated_whole() -> None:
+    world = ChunkedWorld(shape=100_000, seed=1, data_file_path=None)
+    world.next_iteration()
+    assert world.get_downsampled_entity_type_codes(max_size=1000).shape == (1000, 1000)
+    assert world.block_amount <= 4
+    with pytest.raises(ValueError):
+        world.get_entity_type_codes()
+    with pytest.raises(ValueError):
+        world.get_matching_entity_type_positions(target_entity_type=EntityType.HEALTHY)
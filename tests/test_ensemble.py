@@ -0,0 +1,40 @@
+"""Tests of the ensemble aggregation."""
+import numpy as np
+
+
+from Ensemble.ensemble import EnsembleAggregator
+
+
+def test_aggregated_curves_match_the_padded_runs() -> None:
+    generator = np.random.default_rng(seed=0)
+    quantiles = (0.05, 0.5, 0.95)
+    aggregator = EnsembleAggregator(max_value=10_000, quantiles=quantiles)
+    runs = []
+    for _ in range(50):
+        iteration_amount = int(generator.integers(low=5, high=40))
+        rows = np.column_stack((np.arange(iteration_amount), np.cumsum(generator.integers(low=0, high=250, size=(iteration_amount, 2)), axis=0)))
+        aggregator.add(columns=['Iteration', 'Infected', 'Dead'], rows=rows)
+        runs.append(rows[:, 1:])
+    iteration_amount = max(len(rows) for rows in runs)
+    stacked_runs = np.stack([np.concatenate((rows, np.repeat(rows[-1:], iteration_amount - len(rows), axis=0))) for rows in runs])
+
+    header, rows = aggregator.summarize()
+    assert header == ['Iteration', 'Infected_mean', 'Infected_q5', 'Infected_q50', 'Infected_q95', 'Dead_mean', 'Dead_q5', 'Dead_q50', 'Dead_q95']
+    assert np.array_equal(rows[:, 0], np.arange(iteration_amount))
+    for column in range(2):
+        curves = rows[:, 1 + 4 * column:5 + 4 * column]
+        assert np.allclose(curves[:, 0], np.mean(stacked_runs[:, :, column], axis=0))
+        for index, quantile in enumerate(quantiles, start=1):
+            # Only as precise as the histogram bins, about one percent.
+            assert np.allclose(curves[:, index], np.quantile(stacked_runs[:, :, column], q=quantile, axis=0), rtol=0.02, atol=1)
+
+
+def test_quantiles_of_identical_runs_are_their_values() -> None:
+    aggregator = EnsembleAggregator(max_value=250_000)
+    rows = np.array([[0, 399, 237_499], [1, 250_000, 12]])
+    for _ in range(20):
+        aggregator.add(columns=['Iteration', 'Infected', 'Healthy'], rows=rows)
+    _, summary = aggregator.summarize()
+    # Every curve (the mean and each quantile) of a column is the value of every run.
+    assert np.array_equal(summary[:, 1:5], np.repeat(rows[:, 1:2], 4, axis=1))
+    assert np.array_equal(summary[:, 5:9], np.repeat(rows[:, 2:3], 4, axis=1))
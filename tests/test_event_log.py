@@ -0,0 +1,27 @@
+"""Tests of the log of the tiles changed by every iteration."""
+import numpy as np
+import pytest
+
+
+from Entity.entity_type import ENTITY_TYPE_CODES, EntityType
+from World.array_world import ArrayWorld, TILE_FIELDS
+from World.event_log import EventLogReader
+
+
+@pytest.mark.parametrize('keyframe_every', [0, 7])
+def test_replayed_worlds_match_the_live_world(tmp_path, keyframe_every: int) -> None:
+    world = ArrayWorld(shape=30, seed=5, data_file_path=None, batched=True)
+    world.record_events(directory=str(tmp_path), keyframe_every=keyframe_every)
+    states = [{field: getattr(world, field).copy() for field in TILE_FIELDS}]
+    while world.has_infected_entities():
+        world.next_iteration()
+        states.append({field: getattr(world, field).copy() for field in TILE_FIELDS})
+    world.close()
+
+    reader = EventLogReader(directory=str(tmp_path))
+    assert reader.last_iteration == len(states) - 1
+    for iteration, state in enumerate(states):
+        replayed_world = reader.load_world(iteration=iteration)
+        for field in TILE_FIELDS:
+            assert np.array_equal(getattr(replayed_world, field), state[field]), (iteration, field)
+        assert np.array_equal(replayed_world.infected_index.to_array(), np.flatnonzero(state['entity_types'] == ENTITY_TYPE_CODES[EntityType.INFECTED]))
@@ -0,0 +1,34 @@
+"""Tests of the iteration profiler and its exporters."""
+import tracemalloc
+
+
+from World.array_world import ArrayWorld
+from World.profiler import PROFILED_PHASES, IterationProfiler, PrometheusExporter
+
+
+def test_every_phase_is_exported() -> None:
+    exporter = PrometheusExporter(port=0)
+    world = ArrayWorld(shape=30, seed=0, data_file_path=None, batched=True)
+    world.set_profiler(profiler=IterationProfiler(observers=[exporter], trace_allocations=True))
+    for _ in range(3):
+        world.next_iteration()
+    metrics = exporter.format_metrics()
+    # Also stops serving the metrics.
+    world.profiler.close()
+    world.close()
+    for phase in PROFILED_PHASES:
+        assert f'infection_simulator_phase_seconds_total{{phase="{phase}"}}' in metrics
+    # Net allocations can go down, so they can't be exported as a counter.
+    assert '# TYPE infection_simulator_phase_allocated_bytes gauge' in metrics
+    assert 'allocated_bytes_total' not in metrics
+
+
+def test_only_the_tracing_started_by_a_profiler_is_stopped() -> None:
+    tracemalloc.start()
+    try:
+        IterationProfiler(trace_allocations=True).close()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    IterationProfiler(trace_allocations=True).close()
+    assert not tracemalloc.is_tracing()
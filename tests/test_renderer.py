@@ -0,0 +1,28 @@
+"""Tests of the world drawing and recording."""
+import numpy as np
+import pytest
+
+
+from World.array_world import ArrayWorld
+from World.renderer import ENTITY_TYPE_PALETTE
+
+
+def test_gif_frames_are_written_as_recorded(tmp_path) -> None:
+    image_module = pytest.importorskip('PIL.Image')
+    image_sequence_module = pytest.importorskip('PIL.ImageSequence')
+    world = ArrayWorld(shape=60, seed=0, data_file_path=None, batched=True)
+    world.record_frames(path=str(tmp_path / 'world.gif'), max_size=25)
+    grids = []
+    for _ in range(8):
+        grids.append(world.get_downsampled_entity_type_codes(max_size=25).copy())
+        world.next_iteration()
+    # Every frame recorded so far is already in the file, before closing it.
+    world.frame_recorder.flush()
+    assert (tmp_path / 'world.gif').stat().st_size > 0
+    world.close()
+
+    with image_module.open(str(tmp_path / 'world.gif')) as image:
+        frames = [np.array(frame.convert('RGB')) for frame in image_sequence_module.Iterator(image)]
+    assert len(frames) == len(grids)
+    for frame, grid in zip(frames, grids):
+        assert np.array_equal(frame, ENTITY_TYPE_PALETTE[grid])
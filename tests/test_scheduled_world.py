@@ -0,0 +1,28 @@
+"""Tests of the world driven by scheduled events."""
+from World.array_world import ArrayWorld
+from World.scheduled_world import ScheduledWorld
+from world_statistics import assert_same_statistics, run_seeded_worlds
+
+
+def test_scheduled_world_matches_batched_world(tmp_path) -> None:
+    columns, runs = run_seeded_worlds(create_world=lambda **arguments: ArrayWorld(shape=30, batched=True, **arguments), seeds=range(24), directory=str(tmp_path))
+    _, scheduled_runs = run_seeded_worlds(create_world=lambda **arguments: ScheduledWorld(shape=30, **arguments), seeds=range(24), directory=str(tmp_path))
+    assert_same_statistics(columns=columns, runs=runs, other_runs=scheduled_runs)
+
+
+def test_counters_match_a_full_scan() -> None:
+    world = ScheduledWorld(shape=30, seed=3, data_file_path=None, check_counters=True)
+    while world.has_infected_entities():
+        world.next_iteration()
+    world.save_state()
+
+
+def test_entity_ids_are_reused() -> None:
+    world = ScheduledWorld(shape=30, seed=3, data_file_path=None)
+    most_infected = len(world.infected_index)
+    while world.has_infected_entities():
+        world.next_iteration()
+        most_infected = max(most_infected, len(world.infected_index))
+    # Every scheduled entity is infected, an id is freed once its entity heals or dies.
+    assert world.next_entity_id - 1 <= most_infected
+    assert world.free_entity_ids.size == world.next_entity_id - 1
@@ -0,0 +1,31 @@
+"""Tests of the statistics sinks."""
+import numpy as np
+import pytest
+
+
+from Ensemble.ensemble import read_data_file
+from World.statistics_sink import STATISTICS_COLUMNS, BufferedStatisticsSink, CsvStatisticsSink, NpyStatisticsSink
+
+
+def test_buffered_sinks_need_a_file_format(tmp_path) -> None:
+    with pytest.raises(TypeError):
+        # pylint: disable=E0110
+        BufferedStatisticsSink(path=str(tmp_path / 'data'))
+
+
+@pytest.mark.parametrize('sink_class, file_name', [(CsvStatisticsSink, 'data.csv'), (NpyStatisticsSink, 'data.npy')])
+def test_every_written_row_is_saved(tmp_path, sink_class: type, file_name: str) -> None:
+    rows = np.arange(5 * len(STATISTICS_COLUMNS)).reshape(5, len(STATISTICS_COLUMNS))
+    # Smaller batches than rows, so some are written before closing.
+    sink = sink_class(path=str(tmp_path / file_name), batch_size=2)
+    for row in rows:
+        sink.write_row(row=tuple(row))
+    sink.close()
+    if sink_class is NpyStatisticsSink:
+        saved_rows = np.load(str(tmp_path / file_name))
+        assert saved_rows.dtype.names == STATISTICS_COLUMNS
+        saved_rows = np.column_stack([saved_rows[column] for column in STATISTICS_COLUMNS])
+    else:
+        columns, saved_rows = read_data_file(data_file_path=str(tmp_path / file_name))
+        assert tuple(columns) == STATISTICS_COLUMNS
+    assert np.array_equal(saved_rows, rows)
@@ -0,0 +1,10 @@
+"""Tests of the world split in strips."""
+from World.array_world import ArrayWorld
+from World.strip_world import StripWorld
+from world_statistics import assert_same_statistics, run_seeded_worlds
+
+
+def test_strip_world_matches_batched_world(tmp_path) -> None:
+    columns, runs = run_seeded_worlds(create_world=lambda **arguments: ArrayWorld(shape=30, batched=True, **arguments), seeds=range(24), directory=str(tmp_path))
+    _, strip_runs = run_seeded_worlds(create_world=lambda **arguments: StripWorld(shape=30, processes=3, **arguments), seeds=range(24), directory=str(tmp_path))
+    assert_same_statistics(columns=columns, runs=runs, other_runs=strip_runs)
@@ -0,0 +1,14 @@
+"""Tests of the parameter sweep."""
+import pytest
+
+
+from Sweep.sweep import expand_grid
+from World.array_world import MAX_INFECTION_DURATION
+
+
+def test_infection_durations_life_spans_cant_hold_are_rejected() -> None:
+    assert len(expand_grid(grid={'infection_duration': [0, MAX_INFECTION_DURATION]})) == 2
+    with pytest.raises(ValueError):
+        expand_grid(grid={'infection_duration': [MAX_INFECTION_DURATION + 1]})
+    with pytest.raises(ValueError):
+        expand_grid(grid={'infection_duration': [-1]})
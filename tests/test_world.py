@@ -0,0 +1,17 @@
+"""Tests of the object world."""
+from World.array_world import ArrayWorld
+from World.world import World
+from world_statistics import assert_same_statistics, run_seeded_worlds
+
+
+def test_swapped_entities_know_their_position() -> None:
+    world = World(shape=5, seed=0, data_file_path=None)
+    world.swap_tiles(old_pos=(0, 0), new_pos=(0, 1))
+    assert world.get_tile(position=(0, 0)).position == (0, 0)
+    assert world.get_tile(position=(0, 1)).position == (0, 1)
+
+
+def test_array_world_matches_world(tmp_path) -> None:
+    columns, runs = run_seeded_worlds(create_world=lambda **arguments: World(shape=30, **arguments), seeds=range(20), directory=str(tmp_path))
+    _, array_runs = run_seeded_worlds(create_world=lambda **arguments: ArrayWorld(shape=30, **arguments), seeds=range(20), directory=str(tmp_path))
+    assert_same_statistics(columns=columns, runs=runs, other_runs=array_runs)
@@ -0,0 +1,51 @@
+"""Helpers running many seeded worlds and comparing their statistics, iteration by iteration."""
+import os
+from typing import Callable
+import numpy as np
+
+
+from Ensemble.ensemble import read_data_file
+from World.world import World
+
+
+# How many standard errors apart two per-iteration means can be.
+MAX_STANDARD_ERRORS: float = 5.0
+
+# How far apart two per-iteration means can always be, in entities (so constant columns can't fail on rounding).
+MIN_TOLERANCE: float = 1.0
+
+
+def run_seeded_worlds(create_world: Callable[..., World], seeds: range, directory: str) -> tuple[list[str], np.ndarray]:
+    """Run a world per seed until no infected entity remains and get the columns and the stacked rows of their data files.
+
+    A run shorter than the longest one keeps its last (settled) row until the end.
+    """
+    columns, runs = [], []
+    for seed in seeds:
+        data_file_path = os.path.join(directory, f'{seed}.csv')
+        world = create_world(seed=seed, data_file_path=data_file_path)
+        while world.has_infected_entities():
+            world.next_iteration()
+        world.save_state()
+        world.close()
+        columns, rows = read_data_file(data_file_path=data_file_path)
+        runs.append(rows)
+        del world
+    iteration_amount = max(len(rows) for rows in runs)
+    return columns, np.stack([np.concatenate((rows, np.repeat(rows[-1:], iteration_amount - len(rows), axis=0))) for rows in runs])
+
+
+def assert_same_statistics(columns: list[str], runs: np.ndarray, other_runs: np.ndarray) -> None:
+    """Check that the per-iteration mean of every column is the same for two sets of runs, up to their standard error."""
+    iteration_amount = max(runs.shape[1], other_runs.shape[1])
+    runs, other_runs = (np.concatenate((rows, np.repeat(rows[:, -1:], iteration_amount - rows.shape[1], axis=1)), axis=1) for rows in (runs, other_runs))
+    standard_errors = np.sqrt(np.var(runs, axis=0, ddof=1) / len(runs) + np.var(other_runs, axis=0, ddof=1) / len(other_runs))
+    differences = np.abs(np.mean(runs, axis=0) - np.mean(other_runs, axis=0))
+    is_too_far = differences > MAX_STANDARD_ERRORS * standard_errors + MIN_TOLERANCE
+    if np.any(is_too_far):
+        iteration, column = np.argwhere(is_too_far)[np.argmax(differences[is_too_far] / np.maximum(standard_errors[is_too_far], 1e-9))]
+        raise AssertionError(
+            f'The mean {columns[column]} of iteration {iteration} differs by {differences[iteration, column]:.1f} '
+            f'({differences[iteration, column] / max(standard_errors[iteration, column], 1e-9):.1f} standard errors), '
+            f'{np.count_nonzero(is_too_far)} means in all.'
+        )